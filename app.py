@@ -4,10 +4,12 @@
 from __future__ import annotations
 
 import os
-import time
 import sys
 import re
-import json
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any, Dict, Tuple
 
 # ✅ FIX UTF-8 para Windows (emojis sin crashear)
@@ -17,11 +19,13 @@ try:
 except Exception:
     pass
 
-from flask import Flask, request, jsonify
+import orjson
+from flask import Flask, Response, request
+from flask.json.provider import DefaultJSONProvider
 from dotenv import dotenv_values
 
 from config_db import load_config
-from symbol_queue import SymbolQueueManager, EnqueuedSignal
+from symbol_queue import SymbolQueueManager, EnqueuedSignal, EnqueueResult
 from bitunix_client import BitunixClient
 from executor import TradeExecutor
 
@@ -42,9 +46,30 @@ FLASK_HOST = (cfg_env.get("FLASK_HOST") or "0.0.0.0").strip()
 FLASK_PORT = int((cfg_env.get("FLASK_PORT") or "5001").strip())
 
 
+# -------------------- LOGGING --------------------
+# executor y symbol_queue loguean a una cola (encolar ~µs en el hot path); un
+# solo hilo escribe a stdout con el mismo formato que los print (la GUI lee stdout).
+
+_LOG_QUEUE: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_stdout_handler = logging.StreamHandler(sys.stdout)
+_stdout_handler.setFormatter(logging.Formatter("%(message)s"))
+LOG_LISTENER = QueueListener(_LOG_QUEUE, _stdout_handler)
+LOG_LISTENER.start()
+atexit.register(LOG_LISTENER.stop)  # vacía lo pendiente al salir
+
+for _name in ("executor", "symbol_queue"):
+    _lg = logging.getLogger(_name)
+    _lg.addHandler(QueueHandler(_LOG_QUEUE))
+    _lg.setLevel(logging.INFO)
+    _lg.propagate = False
+
+
 # -------------------- INIT CORE --------------------
 
 CONFIG_BY_SYMBOL = load_config(DB_PATH)
+# snapshot fijo para tests de pertenencia: CONFIG_BY_SYMBOL se carga una sola
+# vez al arrancar (si algún día se recarga en caliente, rehacer este set)
+_SYMBOLS_SET = frozenset(CONFIG_BY_SYMBOL)
 
 CLIENT = BitunixClient(api_key=API_KEY, api_secret=API_SECRET)
 
@@ -61,21 +86,48 @@ QUEUE = SymbolQueueManager(
     max_queue_per_symbol=500,
     daemon_workers=True,
 )
+# colas de los símbolos de la DB y pool creados ya (no en la primera señal)
+QUEUE.prime(CONFIG_BY_SYMBOL)
+
+# -------------------- REGEX (precompiladas) --------------------
+# Todas ASCII: los símbolos/señales solo usan [A-Z0-9._-].
+
+_RE_EXCHANGE = re.compile(r"\b[A-Z0-9_\-]+:([A-Z0-9.\-]{3,})\b", re.ASCII)
+_RE_USDT = re.compile(r"\b([A-Z0-9]{2,}USDT(?:\.P)?)\b", re.ASCII)
+_RE_PARA_EN = re.compile(r"\b(?:PARA|EN)\s+([A-Z0-9.\-]{3,})\s+A\b", re.ASCII)
+_RE_DOTTED = re.compile(r"\b([A-Z0-9]{3,}\.[A-Z0-9]{1,6})\b", re.ASCII)
+_RE_LONG = re.compile(r"\bLONG\b", re.ASCII)
+_RE_SHORT = re.compile(r"\bSHORT\b", re.ASCII)
 
 # -------------------- FLASK --------------------
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON de Flask vía orjson (por si algún endpoint futuro usa jsonify)."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
 
+def _json(obj: Any, code: int = 200) -> Response:
+    return Response(orjson.dumps(obj), status=code, mimetype="application/json")
 
-def _bad(msg: str, code: int = 400):
-    return jsonify({"ok": False, "error": msg}), code
 
+def _bad(msg: str, code: int = 400) -> Response:
+    return _json({"ok": False, "error": msg}, code)
 
-def _get_raw_body_text() -> str:
+
+def _get_raw_body_bytes() -> bytes:
     try:
-        raw = request.get_data(cache=False, as_text=True) or ""
+        raw = request.get_data(cache=False) or b""
     except Exception:
-        raw = ""
+        raw = b""
     return raw.strip()
 
 
@@ -85,20 +137,24 @@ def _parse_body_best_effort() -> Dict[str, Any]:
     - JSON válido aunque el Content-Type sea text/plain
     - Texto plano
     """
-    raw = _get_raw_body_text()
-    if not raw:
+    raw_bytes = _get_raw_body_bytes()
+    if not raw_bytes:
         return {}
 
-    # Intento 1: JSON
-    try:
-        obj = json.loads(raw)
-        if isinstance(obj, dict):
-            obj["_raw_body"] = raw
-            return obj
-    except Exception:
-        pass
+    # Intento 1: JSON (orjson parsea bytes directo, sin pasar por str).
+    # Solo nos sirve un objeto, así que si no empieza por "{" ni lo intentamos
+    # (no miramos Content-Type: TradingView manda JSON como text/plain).
+    if raw_bytes[:1] == b"{":
+        try:
+            obj = orjson.loads(raw_bytes)
+            if isinstance(obj, dict):
+                obj["_raw_body"] = raw_bytes.decode("utf-8", errors="replace")
+                return obj
+        except orjson.JSONDecodeError:
+            pass
 
     # Intento 2: texto plano -> lo guardamos como content
+    raw = raw_bytes.decode("utf-8", errors="replace")
     return {"content": raw, "_raw_body": raw}
 
 
@@ -115,24 +171,27 @@ def _extract_symbol_from_text(text_upper: str) -> str:
     t = text_upper.strip()
 
     # 1) EXCHANGE:SYMBOL  -> SYMBOL
-    m = re.search(r"\b[A-Z0-9_\-]+:([A-Z0-9.\-]{3,})\b", t)
-    if m:
-        return m.group(1).strip().upper()
+    if ":" in t:
+        m = _RE_EXCHANGE.search(t)
+        if m:
+            return m.group(1).strip().upper()
 
     # 2) AlgoUSDT(.P opcional)
-    m = re.search(r"\b([A-Z0-9]{2,}USDT(?:\.P)?)\b", t)
-    if m:
-        return m.group(1).strip().upper()
+    if "USDT" in t:
+        m = _RE_USDT.search(t)
+        if m:
+            return m.group(1).strip().upper()
 
     # 3) "PARA <SYMBOL> A" o "EN <SYMBOL> A"
-    m = re.search(r"\b(?:PARA|EN)\s+([A-Z0-9.\-]{3,})\s+A\b", t)
+    m = _RE_PARA_EN.search(t)
     if m:
         return m.group(1).strip().upper()
 
     # 4) último intento: token con punto (ej: SOLUSDT.P)
-    m = re.search(r"\b([A-Z0-9]{3,}\.[A-Z0-9]{1,6})\b", t)
-    if m:
-        return m.group(1).strip().upper()
+    if "." in t:
+        m = _RE_DOTTED.search(t)
+        if m:
+            return m.group(1).strip().upper()
 
     return ""
 
@@ -152,10 +211,12 @@ def _infer_signal_from_text(text_upper: str) -> str:
     if "SELL TP" in t or "TP BAJISTA" in t:
         return "SELL_TP"
 
-    # Entradas
-    if re.search(r"\bLONG\b", t):
+    # Entradas (substring barato antes de la regex)
+    if "LONG" not in t and "SHORT" not in t:
+        return ""
+    if _RE_LONG.search(t):
         return "LONG"
-    if re.search(r"\bSHORT\b", t):
+    if _RE_SHORT.search(t):
         return "SHORT"
 
     return ""
@@ -174,18 +235,18 @@ def _map_symbol_to_db(symbol: str) -> str:
     if not s:
         return ""
 
-    if s in CONFIG_BY_SYMBOL:
+    if s in _SYMBOLS_SET:
         return s
 
     # Si llega con .P -> probar sin .P
     if s.endswith(".P"):
         base = s[:-2]
-        if base in CONFIG_BY_SYMBOL:
+        if base in _SYMBOLS_SET:
             return base
 
     # Si llega sin .P -> probar con .P
     alt = s + ".P"
-    if alt in CONFIG_BY_SYMBOL:
+    if alt in _SYMBOLS_SET:
         return alt
 
     return s  # devuelve lo que hay; luego validamos y soltamos error claro
@@ -225,7 +286,7 @@ def _resolve_symbol_and_signal(data: Dict[str, Any]) -> Tuple[str, str]:
 
 @app.route("/health", methods=["GET"])
 def health():
-    return jsonify({"ok": True})
+    return _json({"ok": True})
 
 
 @app.route("/webhook", methods=["POST"])
@@ -242,17 +303,24 @@ def webhook():
         return _bad("Señal inválida o no detectada (LONG/SHORT/BUY_TP/SELL_TP)")
 
     # Validar que exista en config DB
-    if symbol not in CONFIG_BY_SYMBOL:
+    if symbol not in _SYMBOLS_SET:
         return _bad(f"symbol sin config: {symbol} (revisa cómo está guardado en bot_config.db)")
 
     payload = {"signal": signal, **data}
-    sig = EnqueuedSignal(symbol=symbol, payload=payload, received_ts=time.time())
+    sig = EnqueuedSignal(symbol=symbol, payload=payload)
     ok = QUEUE.enqueue(sig)
 
     if not ok:
         return _bad(f"cola llena para {symbol}", code=429)
 
-    return jsonify({"ok": True, "enqueued": True, "symbol": symbol, "signal": signal})
+    # high_water: encolada, pero la cola del símbolo pasó el 80% (frenar upstream)
+    return _json({
+        "ok": True,
+        "enqueued": True,
+        "symbol": symbol,
+        "signal": signal,
+        "high_water": ok is EnqueueResult.ACCEPTED_HIGH_WATER,
+    })
 
 
 if __name__ == "__main__":
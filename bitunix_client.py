@@ -14,13 +14,54 @@ FIX importante:
 from __future__ import annotations
 
 import time
-import uuid
-import json
+import socket
 import hashlib
+import secrets
+import itertools
+from urllib.parse import urlencode
 from decimal import Decimal, InvalidOperation
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+
+# Nonce = prefijo aleatorio por proceso + contador (único por request, sin
+# leer del CSPRNG en cada llamada). 16 + 16 hex = 32 chars, como uuid4().hex.
+_NONCE_PREFIX = secrets.token_hex(8)
+_NONCE_SEQ = itertools.count()
+
+# Decimal es inmutable: un único cero compartido para los fallbacks
+_DEC_ZERO = Decimal(0)
+
+# campos donde Bitunix puede devolver el timestamp de creación de una orden
+_CTIME_KEYS = ("createTime", "ctime", "time", "mtime")
+
+# TCP keepalive en las conexiones del pool: routers/NAT no tiran en silencio
+# una conexión ociosa entre señales (el siguiente request no paga TLS otra vez
+# ni se come un reset). TCP_KEEPIDLE/INTVL no existen en todas las plataformas.
+_KEEPALIVE_SOCKET_OPTIONS = list(HTTPConnection.default_socket_options) + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+if hasattr(socket, "TCP_KEEPIDLE"):
+    _KEEPALIVE_SOCKET_OPTIONS.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30))
+if hasattr(socket, "TCP_KEEPINTVL"):
+    _KEEPALIVE_SOCKET_OPTIONS.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10))
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs["socket_options"] = _KEEPALIVE_SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _rejects_start_time(e: Exception) -> bool:
+    """¿Error de la API (no HTTP/red) quejándose del parámetro startTime?"""
+    msg = str(e)
+    if not msg.startswith("API error code="):
+        return False
+    low = msg.lower()
+    return "starttime" in low or "parameter" in low
 
 
 class BitunixClient:
@@ -31,18 +72,33 @@ class BitunixClient:
         base_url: str = "https://fapi.bitunix.com",
         timeout_sec: int = 20,
         user_agent: str = "bitunix-bot/real/1.0",
+        pool_connections: int = 32,
+        pool_maxsize: int = 64,
     ) -> None:
         self.api_key = (api_key or "").strip()
         self.api_secret = (api_secret or "").strip()
         if not self.api_key or not self.api_secret:
             raise ValueError("Faltan api_key/api_secret")
 
+        # pre-encodados para firmar sin re-encodar en cada request
+        self._api_key_b = self.api_key.encode("utf-8")
+        self._api_secret_b = self.api_secret.encode("utf-8")
+
         self.base_url = base_url.rstrip("/")
         self.timeout = int(timeout_sec)
 
+        # si la API rechaza startTime en tpsl/get_pending_orders, dejamos de mandarlo
+        self._tpsl_start_time_ok = True
+
         self.session = requests.Session()
         self.session.headers.update({"User-Agent": user_agent})
 
+        # Pool keep-alive más grande que el default (10): con ráfagas de señales
+        # de varios símbolos + monitores no reabrimos TLS en cada request.
+        # Sin reintentos automáticos: reenviar un place_order no es idempotente.
+        adapter = _KeepAliveAdapter(pool_connections=int(pool_connections), pool_maxsize=int(pool_maxsize))
+        self.session.mount("https://", adapter)
+
     # ----------------- helpers -----------------
 
     @staticmethod
@@ -50,39 +106,49 @@ class BitunixClient:
         try:
             return Decimal(str(x))
         except (InvalidOperation, ValueError, TypeError):
-            return Decimal("0")
+            return _DEC_ZERO
 
     @staticmethod
-    def _sha256_hex(s: str) -> str:
-        return hashlib.sha256(s.encode("utf-8")).hexdigest()
+    def _sha256_hex(b: bytes) -> str:
+        return hashlib.sha256(b).hexdigest()
 
     @staticmethod
-    def _body_for_sign(body: Optional[Dict[str, Any]]) -> str:
+    def _body_bytes(body: Optional[Dict[str, Any]]) -> bytes:
+        # orjson: sin espacios (",", ":") y sin escapar unicode, igual que el
+        # json.dumps(separators=..., ensure_ascii=False) que se firmaba antes.
         if not body:
-            return ""
-        return json.dumps(body, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+            return b""
+        return orjson.dumps(body, option=orjson.OPT_SORT_KEYS)
 
     @staticmethod
     def _qp_for_sign(params: Optional[Dict[str, Any]]) -> str:
         if not params:
             return ""
-        parts: List[str] = []
-        for k in sorted(params.keys(), key=lambda x: str(x)):
-            v = params[k]
-            if v is None:
-                continue
-            parts.append(f"{k}{v}")
-        return "".join(parts)
+        return "".join(f"{k}{params[k]}" for k in sorted(params, key=str) if params[k] is not None)
+
+    @staticmethod
+    def _query_string(params: Optional[Dict[str, Any]]) -> str:
+        # mismo orden y mismos filtros que _qp_for_sign (requests también omite None)
+        if not params:
+            return ""
+        return urlencode([(k, params[k]) for k in sorted(params, key=str) if params[k] is not None])
 
     def _sign_request(
         self,
         nonce: str,
         timestamp: str,
         qp_for_sign: str,
-        body_for_sign: str,
+        body_for_sign: bytes,
     ) -> str:
-        digest = self._sha256_hex(nonce + timestamp + self.api_key + qp_for_sign + body_for_sign)
-        return self._sha256_hex(digest + self.api_secret)
+        # sign = sha256(sha256(nonce + timestamp + apiKey + qp + body) + secret)
+        digest = self._sha256_hex(b"".join((
+            nonce.encode("ascii"),
+            timestamp.encode("ascii"),
+            self._api_key_b,
+            qp_for_sign.encode("utf-8"),
+            body_for_sign,
+        )))
+        return self._sha256_hex(digest.encode("ascii") + self._api_secret_b)
 
     def _signed_request(
         self,
@@ -94,12 +160,12 @@ class BitunixClient:
         method = method.upper()
         url = self.base_url + path
 
-        nonce = uuid.uuid4().hex
+        nonce = f"{_NONCE_PREFIX}{next(_NONCE_SEQ):016x}"
         timestamp = str(int(time.time() * 1000))
 
         qp_for_sign = self._qp_for_sign(params)
-        body_for_sign = self._body_for_sign(body)
-        sign = self._sign_request(nonce, timestamp, qp_for_sign, body_for_sign)
+        body_bytes = self._body_bytes(body)
+        sign = self._sign_request(nonce, timestamp, qp_for_sign, body_bytes)
 
         headers = {
             "api-key": self.api_key,
@@ -110,14 +176,19 @@ class BitunixClient:
             "Content-Type": "application/json",
         }
 
+        # URL ya armada: evita que requests vuelva a codificar params
+        qs = self._query_string(params)
+        if qs:
+            url = f"{url}?{qs}"
+
         if method == "GET":
-            r = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            r = self.session.get(url, headers=headers, timeout=self.timeout)
         else:
-            r = self.session.request(method, url, params=params, headers=headers, data=body_for_sign, timeout=self.timeout)
+            r = self.session.request(method, url, headers=headers, data=body_bytes, timeout=self.timeout)
 
         try:
-            data = r.json()
-        except Exception:
+            data = orjson.loads(r.content)
+        except orjson.JSONDecodeError:
             raise RuntimeError(f"HTTP {r.status_code} no JSON: {r.text[:400]}")
 
         if data.get("code") != 0:
@@ -128,29 +199,40 @@ class BitunixClient:
         url = self.base_url + path
         r = self.session.get(url, params=params, timeout=self.timeout)
         r.raise_for_status()
-        data = r.json()
+        data = orjson.loads(r.content)
         if data.get("code") != 0:
             raise RuntimeError(f"Public API error code={data.get('code')} msg={data.get('msg')} data={data.get('data')}")
         return data.get("data")
 
+    @staticmethod
+    def _order_id_of(o: Dict[str, Any]) -> str:
+        oid = o.get("orderId")
+        if oid:
+            return str(oid)
+        oid = o.get("id")
+        return str(oid) if oid else ""
+
     @staticmethod
     def extract_order_id(resp: Any) -> str:
-        if resp is None:
-            return ""
+        # caso común primero: dict con orderId
         if isinstance(resp, dict):
-            return str(resp.get("orderId") or resp.get("id") or "")
+            return BitunixClient._order_id_of(resp)
         if isinstance(resp, list):
             if not resp:
                 return ""
             first = resp[0]
             if isinstance(first, dict):
-                return str(first.get("orderId") or first.get("id") or "")
+                return BitunixClient._order_id_of(first)
             return str(first)
         return ""
 
     @staticmethod
     def _extract_id_field(o: Dict[str, Any]) -> str:
-        return str(o.get("id") or o.get("orderId") or "")
+        oid = o.get("id")
+        if oid:
+            return str(oid)
+        oid = o.get("orderId")
+        return str(oid) if oid else ""
 
     # ----------------- public market data -----------------
 
@@ -160,6 +242,18 @@ class BitunixClient:
             raise RuntimeError(f"No encontré info del símbolo {symbol}")
         return next((x for x in data if str(x.get("symbol", "")).upper() == symbol.upper()), data[0])
 
+    def get_symbols_info(self, symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Info de varios símbolos en UNA llamada. Devuelve { "BTCUSDT": {...} }."""
+        data = self._public_request("/api/v1/futures/market/trading_pairs", {"symbols": ",".join(symbols)})
+        if not isinstance(data, list):
+            return {}
+        out: Dict[str, Dict[str, Any]] = {}
+        for x in data:
+            sym = str(x.get("symbol", "")).upper()
+            if sym:
+                out[sym] = x
+        return out
+
     def get_last_price(self, symbol: str) -> Decimal:
         data = self._public_request("/api/v1/futures/market/tickers", {"symbols": symbol})
         if not isinstance(data, list) or not data:
@@ -167,12 +261,27 @@ class BitunixClient:
         t = next((x for x in data if str(x.get("symbol", "")).upper() == symbol.upper()), data[0])
         return self._d(t.get("lastPrice") or t.get("last") or t.get("markPrice"))
 
+    def get_last_prices(self, symbols: Iterable[str]) -> Dict[str, Decimal]:
+        """
+        Último precio de varios símbolos en UNA llamada (tickers acepta
+        symbols separados por coma). Devuelve { "BTCUSDT": Decimal(...) }.
+        """
+        data = self._public_request("/api/v1/futures/market/tickers", {"symbols": ",".join(symbols)})
+        if not isinstance(data, list):
+            return {}
+        out: Dict[str, Decimal] = {}
+        for t in data:
+            sym = str(t.get("symbol", "")).upper()
+            if sym:
+                out[sym] = self._d(t.get("lastPrice") or t.get("last") or t.get("markPrice"))
+        return out
+
     # ----------------- account / position -----------------
 
     def get_account_available(self, margin_coin: str = "USDT") -> Decimal:
         data = self._signed_request("GET", "/api/v1/futures/account", {"marginCoin": margin_coin})
         if not isinstance(data, list) or not data:
-            return Decimal("0")
+            return _DEC_ZERO
         return self._d(data[0].get("available"))
 
     def get_pending_positions(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -184,10 +293,17 @@ class BitunixClient:
             return []
         return data
 
-    def get_pending_tpsl_orders(self, symbol: Optional[str] = None, limit: int = 200) -> List[Dict[str, Any]]:
+    def get_pending_tpsl_orders(
+        self,
+        symbol: Optional[str] = None,
+        limit: int = 200,
+        start_time: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
         params: Dict[str, Any] = {"limit": int(limit), "skip": 0}
         if symbol:
             params["symbol"] = symbol
+        if start_time is not None:
+            params["startTime"] = int(start_time)
         data = self._signed_request("GET", "/api/v1/futures/tpsl/get_pending_orders", params)
         if not isinstance(data, list):
             return []
@@ -356,31 +472,59 @@ class BitunixClient:
 
     # ----------------- util: capturar SL provisional -----------------
 
+    def _pending_tpsl_since(self, symbol: str, since_ms: int) -> List[Dict[str, Any]]:
+        """
+        Filtra por tiempo en el servidor (startTime) si la API lo acepta;
+        si no, trae todo y el filtro por ctime lo hace el caller.
+        """
+        if self._tpsl_start_time_ok:
+            try:
+                return self.get_pending_tpsl_orders(symbol=symbol, limit=200, start_time=since_ms)
+            except RuntimeError as e:
+                # solo si la API rechaza el parámetro se deja de mandar para
+                # siempre; un fallo transitorio (502, rate limit, firma) solo
+                # hace que esta llamada vaya sin filtro
+                if _rejects_start_time(e):
+                    self._tpsl_start_time_ok = False
+            except Exception:
+                return []
+        try:
+            return self.get_pending_tpsl_orders(symbol=symbol, limit=200)
+        except Exception:
+            return []
+
     def capture_provisional_sl_ids(
         self,
         symbol: str,
         sl_price_str: str,
         since_ms: int,
         tries: int = 6,
-        sleep_sec: float = 1.0,
+        initial_sleep_sec: float = 0.25,
+        max_sleep_sec: float = 2.0,
     ) -> List[str]:
+        """
+        Busca los ids del SL provisional recién creado. Reintenta con backoff
+        exponencial (0.25, 0.5, 1, 2, 2... s): si la orden aparece rápido no
+        esperamos el segundo fijo de antes.
+        """
         ids: List[str] = []
+        sym_upper = symbol.upper()
+        tries = max(1, int(tries))
+        delay = float(initial_sleep_sec)
 
-        for _ in range(max(1, int(tries))):
-            try:
-                pending = self.get_pending_tpsl_orders(symbol=symbol, limit=200)
-            except Exception:
-                pending = []
+        for attempt in range(tries):
+            pending = self._pending_tpsl_since(symbol, since_ms)
 
             for o in pending:
-                if str(o.get("symbol", "")).upper() != symbol.upper():
+                if str(o.get("symbol", "")).upper() != sym_upper:
                     continue
 
                 ctime = 0
-                for k in ("createTime", "ctime", "time", "mtime"):
-                    if o.get(k) is not None:
+                for k in _CTIME_KEYS:
+                    v = o.get(k)
+                    if v is not None:
                         try:
-                            ctime = int(o.get(k))
+                            ctime = int(v)
                             break
                         except Exception:
                             pass
@@ -398,8 +542,9 @@ class BitunixClient:
                     if oid and oid not in ids:
                         ids.append(oid)
 
-            if ids:
+            if ids or attempt == tries - 1:
                 break
-            time.sleep(sleep_sec)
+            time.sleep(delay)
+            delay = min(delay * 2, float(max_sleep_sec))
 
         return ids
@@ -13,15 +13,25 @@ Los porcentajes van en decimal:
 
 from __future__ import annotations
 
+import os
+import sys
 import sqlite3
+import threading
+from types import MappingProxyType
+from functools import lru_cache
+from itertools import chain, groupby
+from operator import itemgetter
+from urllib.request import pathname2url
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
 
 
 # ---------------------------- Models ----------------------------
+# PairConfig: slots=True (sin frozen), construcción más rápida y sin __dict__.
+# TPLevel: NamedTuple, se construye posicional desde la fila del JOIN.
+# Se tratan como inmutables por convención; nadie las modifica tras load_config.
 
-@dataclass(frozen=True)
-class TPLevel:
+class TPLevel(NamedTuple):
     symbol: str
     level: int                 # 1,2,3... (o como lo tengas)
     target_pct: float          # decimal (0.01 = 1%)
@@ -29,7 +39,7 @@ class TPLevel:
     is_enabled: bool
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class PairConfig:
     symbol: str
     is_enabled: bool
@@ -64,204 +74,295 @@ class PairConfig:
 
 # ---------------------------- Helpers ----------------------------
 
+# default si la DB no tiene trailing_trigger_pct (o es NULL)
+_TRAILING_TRIGGER_DEFAULT = 0.02
+
+_MARGIN_MODES = frozenset({"ISOLATION", "CROSS"})
+_POLICIES = frozenset({"IGNORE", "RESET_ORDERS"})
+_SIZE_TYPES = frozenset({"MARGIN_USDT", "NOTIONAL_USDT", "PCT_BALANCE"})
+
+@lru_cache(maxsize=16)
 def _to_bool(v) -> bool:
+    # entradas casi siempre 0/1 (INTEGER de SQLite): memo en vez de int()+try
     try:
         return bool(int(v))
     except Exception:
         return bool(v)
 
 
-def _required_str(row: sqlite3.Row, key: str) -> str:
-    v = row.get(key) if hasattr(row, "get") else row[key]
+def _required_str(v, key: str) -> str:
     if v is None or str(v).strip() == "":
         raise ValueError(f"Campo requerido vacío: {key}")
     return str(v).strip()
 
 
-def _required_int(row: sqlite3.Row, key: str) -> int:
-    v = row.get(key) if hasattr(row, "get") else row[key]
+def _required_upper(v, key: str) -> str:
+    """_required_str + upper, internado: símbolos/enums repetidos comparten objeto."""
+    return sys.intern(_required_str(v, key).upper())
+
+
+def _required_int(v, key: str) -> int:
     if v is None:
         raise ValueError(f"Campo requerido NULL: {key}")
     return int(v)
 
 
-def _required_float(row: sqlite3.Row, key: str) -> float:
-    v = row.get(key) if hasattr(row, "get") else row[key]
+def _required_float(v, key: str) -> float:
     if v is None:
         raise ValueError(f"Campo requerido NULL: {key}")
     return float(v)
 
-def _optional_float(row: sqlite3.Row, key: str, default: float) -> float:
-    """Lee float si existe la columna; si no existe o es NULL, devuelve default."""
-    try:
-        if hasattr(row, "keys") and key not in row.keys():
-            return float(default)
-        v = row.get(key) if hasattr(row, "get") else row[key]
-    except Exception:
-        return float(default)
-    if v is None:
-        return float(default)
-    return float(v)
 
+# ---------------------------- Cache ----------------------------
 
+# db_path -> (stamp de _db_stamp, config)
+_CACHE: Dict[str, Tuple[Tuple[int, ...], Mapping[str, PairConfig]]] = {}
+
+# protege _CACHE y las conexiones compartidas (check_same_thread=False)
+_LOCK = threading.Lock()
 
-# ---------------------------- Public API ----------------------------
 
-def load_config(db_path: str) -> Dict[str, PairConfig]:
+@lru_cache(maxsize=8)
+def _get_conn(db_path: str) -> sqlite3.Connection:
     """
-    Devuelve dict: { "BTCUSDT": PairConfig(...), ... }
-    - Incluye TP levels enabled y ordenados por level asc.
-    - No hace caching: se llama al inicio y listo.
+    Una conexión SOLO LECTURA por archivo para todo el proceso: no pagamos
+    open/close en cada load. La GUI escribe con su propia conexión; como aquí
+    no dejamos transacciones abiertas, cada SELECT ve lo último commiteado.
     """
-    conn = sqlite3.connect(db_path)
+    uri = "file:" + pathname2url(os.path.abspath(db_path)) + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
     conn.row_factory = sqlite3.Row
-    try:
-        pairs = _load_pairs(conn)
-        tps = _load_tp_levels(conn)
-
-        out: Dict[str, PairConfig] = {}
-        for symbol, p in pairs.items():
-            levels = tps.get(symbol, [])
-            out[symbol] = PairConfig(
-                symbol=p["symbol"],
-                is_enabled=_to_bool(p["is_enabled"]),
-                margin_mode=p["margin_mode"],
-                leverage=int(p["leverage"]),
-                order_size_type=p["order_size_type"],
-                order_size_value=float(p["order_size_value"]),
-                sl_enabled=_to_bool(p["sl_enabled"]),
-                sl_pct=float(p["sl_pct"]),
-                tp_enabled=_to_bool(p["tp_enabled"]),
-                breakeven_enabled=_to_bool(p["breakeven_enabled"]),
-                breakeven_trigger_pct=float(p["breakeven_trigger_pct"]),
-                breakeven_offset_pct=float(p["breakeven_offset_pct"]),
-                trailing_enabled=_to_bool(p["trailing_enabled"]),
-                trailing_trigger_pct=float(p["trailing_trigger_pct"]),
-                trailing_step_pct=float(p["trailing_step_pct"]),
-                trailing_distance_pct=float(p["trailing_distance_pct"]),
-                trailing_move_immediately=_to_bool(p["trailing_move_immediately"]),
-                same_side_policy=p["same_side_policy"],
-                tp_levels=levels,
-            )
+    conn.execute("PRAGMA query_only=ON")
+    conn.execute("PRAGMA mmap_size=67108864")
+    return conn
+
+
+def _db_stamp(db_path: str) -> Tuple[int, ...]:
+    """
+    (mtime_ns, size) de la DB y de su -wal. En WAL los commits van al -wal y
+    el archivo principal solo cambia al hacer checkpoint (que además nuestra
+    conexión de lectura abierta puede retrasar): mirar solo el .db no basta.
+    """
+    out: List[int] = []
+    for path in (db_path, db_path + "-wal"):
+        try:
+            st = os.stat(path)
+            out += (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            out += (0, 0)
+    return tuple(out)
+
+
+def invalidate_config(db_path: Optional[str] = None) -> None:
+    """Olvida la config cacheada de db_path (o de todas si es None)."""
+    with _LOCK:
+        if db_path is None:
+            _CACHE.clear()
+        else:
+            _CACHE.pop(db_path, None)
 
+
+# ---------------------------- Public API ----------------------------
+
+def load_config(db_path: str) -> Mapping[str, PairConfig]:
+    """
+    Devuelve mapping de solo lectura: { "BTCUSDT": PairConfig(...), ... }
+    - Incluye TP levels enabled y ordenados por level asc.
+    - Cachea por mtime/tamaño de la DB y su -wal: si no cambiaron, devuelve
+      lo mismo sin volver a leer SQLite.
+    """
+    with _LOCK:
+        stamp = _db_stamp(db_path)
+        cached = _CACHE.get(db_path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        out = _load_config_uncached(_get_conn(db_path))
+        _CACHE[db_path] = (stamp, out)
         return out
-    finally:
-        conn.close()
 
 
-def get_pair(config: Dict[str, PairConfig], symbol: str) -> Optional[PairConfig]:
-    return config.get(symbol.upper())
+def _load_config_uncached(conn: sqlite3.Connection) -> Mapping[str, PairConfig]:
+    # vista inmutable: se comparte entre threads y con la caché sin copiar
+    return MappingProxyType(_load_pairs(conn))
+
+
+def get_pair(config: Mapping[str, PairConfig], symbol: str) -> Optional[PairConfig]:
+    # casi siempre llega ya en mayúsculas (feeds/webhook): lookup directo
+    cfg = config.get(symbol)
+    if cfg is not None:
+        return cfg
+    return config.get(_upper_interned(symbol))
+
+
+@lru_cache(maxsize=1024)
+def _upper_interned(symbol: str) -> str:
+    # pocos símbolos distintos: upper + intern una vez por símbolo
+    return sys.intern(symbol.upper())
 
 
 # ---------------------------- Internal loaders ----------------------------
 
-def _load_pairs(conn: sqlite3.Connection) -> Dict[str, dict]:
+def _pairs_select_sql(conn: sqlite3.Connection) -> str:
+    """
+    Una sola query: pairs_config LEFT JOIN tp_levels (solo enabled).
+    Columnas explícitas en el orden de PairConfig, luego _valid y los campos
+    del TP (NULL si el par no tiene TPs). Ordenado por symbol, level.
+    trailing_trigger_pct es opcional (DBs viejas): si no existe o es NULL, va
+    el default vía COALESCE.
+    """
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(pairs_config)")}
+    tr_trigger = "p.trailing_trigger_pct" if "trailing_trigger_pct" in existing else "NULL"
+    tr_trigger = f"COALESCE({tr_trigger}, {_TRAILING_TRIGGER_DEFAULT})"
+    # _valid = 1 si todos los % están en [0..1] (y no son NULL); lo evalúa SQLite.
+    valid = " AND ".join(
+        f"{c} BETWEEN 0 AND 1"
+        for c in (
+            "p.sl_pct",
+            "p.breakeven_trigger_pct",
+            "p.breakeven_offset_pct",
+            tr_trigger,
+            "p.trailing_step_pct",
+            "p.trailing_distance_pct",
+        )
+    )
+    return (
+        "SELECT p.symbol, p.is_enabled, p.margin_mode, p.leverage, p.order_size_type, p.order_size_value,"
+        " p.sl_enabled, p.sl_pct, p.tp_enabled,"
+        " p.breakeven_enabled, p.breakeven_trigger_pct, p.breakeven_offset_pct,"
+        f" p.trailing_enabled, {tr_trigger}, p.trailing_step_pct, p.trailing_distance_pct,"
+        " p.trailing_move_immediately, p.same_side_policy,"
+        f" ({valid}) AS _valid,"
+        " t.level, t.target_pct, t.close_frac"
+        " FROM pairs_config p"
+        " LEFT JOIN tp_levels t"
+        " ON t.symbol = p.symbol COLLATE NOCASE AND t.is_enabled = 1"
+        " ORDER BY p.symbol, t.level"
+    )
+
+
+def _check_pct_ranges(symbol: str, fields) -> None:
+    """Solo para filas con _valid != 1: encuentra el campo culpable y lanza."""
+    for name, v in fields:
+        v = _required_float(v, name)
+        if v < 0 or v > 1:
+            raise ValueError(f"{symbol}: {name} fuera de rango [0..1]: {v}")
+
+
+def _load_pairs(conn: sqlite3.Connection) -> Dict[str, PairConfig]:
     cur = conn.cursor()
-    cur.execute("SELECT * FROM pairs_config")
-    rows = cur.fetchall()
-
-    pairs: Dict[str, dict] = {}
-    for r in rows:
-        symbol = _required_str(r, "symbol").upper()
-
-        margin_mode = _required_str(r, "margin_mode").upper()
-        if margin_mode not in ("ISOLATION", "CROSS"):
-            raise ValueError(f"{symbol}: margin_mode inválido: {margin_mode}")
-
-        same_side_policy = _required_str(r, "same_side_policy").upper()
-        if same_side_policy not in ("IGNORE", "RESET_ORDERS"):
-            raise ValueError(f"{symbol}: same_side_policy inválido: {same_side_policy}")
-
-        order_size_type = _required_str(r, "order_size_type").upper()
-        if order_size_type not in ("MARGIN_USDT", "NOTIONAL_USDT", "PCT_BALANCE"):
-            raise ValueError(f"{symbol}: order_size_type inválido: {order_size_type}")
-
-        leverage = _required_int(r, "leverage")
-        if leverage < 1:
-            raise ValueError(f"{symbol}: leverage inválido: {leverage}")
-
-        # floats/decimales vienen como REAL -> float. Validamos rangos básicos.
-        sl_pct = _required_float(r, "sl_pct")
-        if sl_pct < 0 or sl_pct > 1:
-            raise ValueError(f"{symbol}: sl_pct fuera de rango [0..1]: {sl_pct}")
-
-        be_trigger = _required_float(r, "breakeven_trigger_pct")
-        be_offset = _required_float(r, "breakeven_offset_pct")
-        for name, v in (("breakeven_trigger_pct", be_trigger), ("breakeven_offset_pct", be_offset)):
-            if v < 0 or v > 1:
-                raise ValueError(f"{symbol}: {name} fuera de rango [0..1]: {v}")
-
-        tr_trigger = _optional_float(r, "trailing_trigger_pct", 0.02)
-        if tr_trigger < 0 or tr_trigger > 1:
-            raise ValueError(f"{symbol}: trailing_trigger_pct fuera de rango [0..1]: {tr_trigger}")
-
-        tr_step = _required_float(r, "trailing_step_pct")
-        tr_dist = _required_float(r, "trailing_distance_pct")
-        for name, v in (
-            ("trailing_step_pct", tr_step),
-            ("trailing_distance_pct", tr_dist),
-        ):
-            if v < 0 or v > 1:
-                raise ValueError(f"{symbol}: {name} fuera de rango [0..1]: {v}")
-
-        pairs[symbol] = {
-            "symbol": symbol,
-            "is_enabled": r["is_enabled"],
-            "margin_mode": margin_mode,
-            "leverage": leverage,
-            "order_size_type": order_size_type,
-            "order_size_value": _required_float(r, "order_size_value"),
-            "sl_enabled": r["sl_enabled"],
-            "sl_pct": sl_pct,
-            "tp_enabled": r["tp_enabled"],
-            "breakeven_enabled": r["breakeven_enabled"],
-            "breakeven_trigger_pct": be_trigger,
-            "breakeven_offset_pct": be_offset,
-            "trailing_enabled": r["trailing_enabled"],
-            "trailing_trigger_pct": tr_trigger,
-            "trailing_step_pct": tr_step,
-            "trailing_distance_pct": tr_dist,
-            "trailing_move_immediately": r["trailing_move_immediately"],
-            "same_side_policy": same_side_policy,
-        }
-
+    cur.row_factory = None  # tuplas planas: desempaquetado posicional
+    cur.execute(_pairs_select_sql(conn))
+
+    pairs: Dict[str, PairConfig] = {}
+    # streaming: sin materializar todas las filas. Un grupo por par
+    # (symbol es PK); cada fila del grupo aporta un TP level.
+    for _, rows in groupby(cur, key=itemgetter(0)):
+        first = next(rows)
+        # strip() de Python (todo espacio en blanco), no TRIM() de SQLite
+        symbol = _required_upper(first[0], "symbol")
+        pairs[symbol] = _pair_from_row(symbol, first, _tp_levels_from_rows(symbol, first, rows))
+
+    _check_tp_levels(conn)
     return pairs
 
 
-def _load_tp_levels(conn: sqlite3.Connection) -> Dict[str, List[TPLevel]]:
-    cur = conn.cursor()
-    cur.execute("SELECT symbol, level, target_pct, close_frac, is_enabled FROM tp_levels ORDER BY symbol, level")
-    rows = cur.fetchall()
-
-    out: Dict[str, List[TPLevel]] = {}
-    for r in rows:
-        symbol = _required_str(r, "symbol").upper()
-        level = int(r["level"])
-        target_pct = float(r["target_pct"])
-        close_frac = float(r["close_frac"])
-        is_enabled = _to_bool(r["is_enabled"])
-
-        # validaciones mínimas
+# Filas de tp_levels (enabled o no) que podrían no pasar la validación: las
+# que SQLite ya ve numéricas y en rango se saltan; el resto se revisa en Python.
+_TP_SUSPECT_SQL = (
+    "SELECT symbol, level, target_pct, close_frac FROM tp_levels"
+    " WHERE NOT (typeof(symbol) = 'text' AND TRIM(symbol) <> ''"
+    " AND typeof(level) = 'integer'"
+    " AND typeof(target_pct) IN ('integer', 'real') AND target_pct > 0 AND target_pct <= 1"
+    " AND typeof(close_frac) IN ('integer', 'real') AND close_frac > 0 AND close_frac <= 1)"
+    " ORDER BY symbol, level"
+)
+
+
+def _check_tp_levels(conn: sqlite3.Connection) -> None:
+    """Valida TODOS los TP levels (también los deshabilitados, que el JOIN no trae)."""
+    for sym, level, target_pct, close_frac in conn.execute(_TP_SUSPECT_SQL):
+        symbol = _required_str(sym, "symbol").upper()
+        level = int(level)
+        target_pct = float(target_pct)
+        close_frac = float(close_frac)
         if target_pct <= 0 or target_pct > 1:
             raise ValueError(f"{symbol} TP level={level}: target_pct inválido: {target_pct}")
         if close_frac <= 0 or close_frac > 1:
             raise ValueError(f"{symbol} TP level={level}: close_frac inválido: {close_frac}")
 
-        if not is_enabled:
-            continue
-
-        out.setdefault(symbol, []).append(
-            TPLevel(
-                symbol=symbol,
-                level=level,
-                target_pct=target_pct,
-                close_frac=close_frac,
-                is_enabled=True,
-            )
-        )
-
-    # ya vienen ordenados por ORDER BY symbol, level, pero por seguridad:
-    for s in out:
-        out[s].sort(key=lambda x: x.level)
 
-    return out
+def _pair_from_row(symbol: str, row: tuple, tp_levels: List[TPLevel]) -> PairConfig:
+    (
+        _, is_enabled, margin_mode, leverage, order_size_type, order_size_value,
+        sl_enabled, sl_pct, tp_enabled,
+        breakeven_enabled, be_trigger, be_offset,
+        trailing_enabled, tr_trigger, tr_step, tr_dist,
+        trailing_move_immediately, same_side_policy, valid,
+    ) = row[:19]
+
+    margin_mode = _required_upper(margin_mode, "margin_mode")
+    if margin_mode not in _MARGIN_MODES:
+        raise ValueError(f"{symbol}: margin_mode inválido: {margin_mode}")
+
+    same_side_policy = _required_upper(same_side_policy, "same_side_policy")
+    if same_side_policy not in _POLICIES:
+        raise ValueError(f"{symbol}: same_side_policy inválido: {same_side_policy}")
+
+    order_size_type = _required_upper(order_size_type, "order_size_type")
+    if order_size_type not in _SIZE_TYPES:
+        raise ValueError(f"{symbol}: order_size_type inválido: {order_size_type}")
+
+    leverage = _required_int(leverage, "leverage")
+    if leverage < 1:
+        raise ValueError(f"{symbol}: leverage inválido: {leverage}")
+
+    # Los rangos ya los validó SQLite (_valid); solo si falla buscamos qué
+    # campo dar en el error.
+    if valid != 1:
+        _check_pct_ranges(symbol, (
+            ("sl_pct", sl_pct),
+            ("breakeven_trigger_pct", be_trigger),
+            ("breakeven_offset_pct", be_offset),
+            ("trailing_trigger_pct", tr_trigger),
+            ("trailing_step_pct", tr_step),
+            ("trailing_distance_pct", tr_dist),
+        ))
+
+    # posicional, en el orden de los campos de PairConfig (sin binding de kwargs)
+    return PairConfig(
+        symbol,
+        _to_bool(is_enabled),
+        margin_mode,
+        leverage,
+        order_size_type,
+        _required_float(order_size_value, "order_size_value"),
+        _to_bool(sl_enabled),
+        float(sl_pct),
+        _to_bool(tp_enabled),
+        _to_bool(breakeven_enabled),
+        float(be_trigger),
+        float(be_offset),
+        _to_bool(trailing_enabled),
+        float(tr_trigger),
+        float(tr_step),
+        float(tr_dist),
+        _to_bool(trailing_move_immediately),
+        same_side_policy,
+        tp_levels,
+    )
+
+
+def _tp_levels_from_rows(symbol: str, first: tuple, rest) -> List[TPLevel]:
+    # LEFT JOIN sin match -> level NULL: el par no tiene TPs enabled
+    if first[19] is None:
+        return []
+
+    levels: List[TPLevel] = []
+    for row in chain((first,), rest):
+        # la query ya filtra is_enabled = 1: lo completamos como bool.
+        # Los rangos los valida _check_tp_levels (todas las filas).
+        levels.append(TPLevel(symbol, int(row[19]), float(row[20]), float(row[21]), True))
+
+    # ya vienen ordenados por el ORDER BY p.symbol, t.level del JOIN
+    return levels
@@ -14,30 +14,69 @@ FIX:
 from __future__ import annotations
 
 import time
+import logging
+import heapq
+import itertools
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
+from operator import itemgetter
 from decimal import Decimal, ROUND_DOWN, InvalidOperation
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
 
 from config_db import PairConfig, TPLevel
 from symbol_queue import EnqueuedSignal
 from bitunix_client import BitunixClient
 
+# Sin handlers propios: app.py lo engancha a una cola (QueueHandler/QueueListener)
+log = logging.getLogger("executor")
+
 
 # ---------------------------- utils num ----------------------------
 
-def _d(x: Any) -> Decimal:
+_DEC_ZERO = Decimal(0)
+
+
+@lru_cache(maxsize=4096)
+def _d_str(s: str) -> Decimal:
+    # qty/precios llegan como string y se repiten mucho entre lecturas
     try:
-        return Decimal(str(x))
+        return Decimal(s)
     except (InvalidOperation, ValueError, TypeError):
-        return Decimal("0")
+        return _DEC_ZERO
+
+
+def _d(x: Any) -> Decimal:
+    if x is None:
+        return _DEC_ZERO
+    t = type(x)
+    if t is Decimal:
+        return x
+    if t is str:
+        return _d_str(x)
+    if t is int:
+        return Decimal(x)
+    return _d_str(str(x))
+
+
+# 10^-p precalculados para las precisiones de Bitunix (0..15): un índice, sin alloc
+_Q_CACHE = tuple(Decimal("1").scaleb(-p) for p in range(16))
+
+
+def _quantum(precision: int) -> Decimal:
+    """10^-precision (>= 1)."""
+    if precision <= 0:
+        return _Q_CACHE[0]
+    if precision < len(_Q_CACHE):
+        return _Q_CACHE[precision]
+    return Decimal("1").scaleb(-precision)
 
 
 def round_down(value: Decimal, precision: int) -> Decimal:
     if precision <= 0:
         return value.to_integral_value(rounding=ROUND_DOWN)
-    q = Decimal("1").scaleb(-precision)
-    return value.quantize(q, rounding=ROUND_DOWN)
+    return value.quantize(_quantum(precision), rounding=ROUND_DOWN)
 
 
 def fmt_decimal(value: Decimal, precision: int) -> str:
@@ -45,7 +84,7 @@ def fmt_decimal(value: Decimal, precision: int) -> str:
 
 
 def tick_size(quote_precision: int) -> Decimal:
-    return Decimal("1").scaleb(-quote_precision) if quote_precision > 0 else Decimal("1")
+    return _quantum(quote_precision)
 
 
 def clamp_sl_not_instant(side: str, sl: Decimal, current: Decimal, quote_precision: int, min_ticks_away: int = 2) -> Decimal:
@@ -94,14 +133,44 @@ def compute_tp_from_entry(entry: Decimal, quote_precision: int, side: str, targe
     return tp
 
 
+# ---- fixed-point para el hot path del monitor ----
+# Precios/SL como enteros en ticks de 10**-quote_precision y % de la config
+# como enteros en nano-unidades: comparaciones y redondeos en aritmética
+# entera exacta. Decimal solo al formatear para la API.
+
+_PCT_SCALE = 10 ** 9  # 0.01 -> 10_000_000
+
+
+@lru_cache(maxsize=256)
+def _pct_n(pct: float) -> int:
+    """% decimal de la config -> nano-unidades (vía str, como Decimal(str(x)))."""
+    return int(Decimal(str(pct)) * _PCT_SCALE)
+
+
+def _to_ticks(value: Decimal, precision: int) -> int:
+    """Decimal -> ticks enteros, ROUND_DOWN (= round_down)."""
+    return int(value.scaleb(max(0, precision)))
+
+
+def _ticks_to_str(ticks: int, precision: int) -> str:
+    """Ticks -> string para la API (= fmt_decimal)."""
+    return format(Decimal(ticks).scaleb(-max(0, precision)), "f")
+
+
+# lado -> código entero (BUY/SELL de la API == LONG/SHORT); -1 = desconocido
+_SIDE_CODE = {"LONG": 0, "BUY": 0, "SHORT": 1, "SELL": 1}
+_SIDE_NAME = ("LONG", "SHORT")
+
+
+def side_code(side: str) -> int:
+    return _SIDE_CODE.get(side.upper(), -1)
+
+
 def side_matches(prefer: str, got: str) -> bool:
-    p = prefer.upper()
-    g = got.upper()
-    if p == "LONG":
-        return g in ("LONG", "BUY")
-    if p == "SHORT":
-        return g in ("SHORT", "SELL")
-    return g == p
+    p = side_code(prefer)
+    if p < 0:
+        return got.upper() == prefer.upper()
+    return side_code(got) == p
 
 
 # ---------------------------- models runtime ----------------------------
@@ -116,102 +185,334 @@ class OpenPosition:
     base_precision: int
     quote_precision: int
     margin_coin: str = "USDT"
+    fetched_at: float = 0.0   # monotonic de la lectura REST (0 = desconocido)
 
 
-# ---------------------------- monitor ----------------------------
+# ---------------------------- price feed ----------------------------
 
-class SymbolMonitor:
-    def __init__(self, client: BitunixClient, symbol: str) -> None:
+class PriceFeed:
+    """
+    Último precio por símbolo compartido por todos los monitores.
+
+    Un solo thread pide en UNA llamada REST los tickers de todos los símbolos
+    suscritos cada refresh_sec; los monitores solo leen el dict (sin I/O).
+    Si el precio cacheado está viejo (feed caído, símbolo recién suscrito)
+    se pide directo por REST.
+
+    Solo se suscriben los símbolos con monitor en marcha (ver
+    MonitorDispatcher.schedule); sin suscritos el thread duerme sin I/O.
+    """
+
+    def __init__(self, client: BitunixClient, refresh_sec: float = 0.5, max_age_sec: float = 3.0) -> None:
         self.client = client
-        self.symbol = symbol.upper()
-        self._lock = threading.RLock()
+        self._refresh = float(refresh_sec)
+        self._max_age = float(max_age_sec)
+        self._lock = threading.Lock()
         self._stop = threading.Event()
-        self._thread = threading.Thread(target=self._loop, name=f"monitor:{self.symbol}", daemon=True)
+        self._wake = threading.Event()  # set mientras haya símbolos suscritos
+        self._thread: Optional[threading.Thread] = None
 
-        self._pos: Optional[OpenPosition] = None
-        self._cfg: Optional[PairConfig] = None
+        # tupla inmutable: el thread del feed la lee sin lock
+        self._symbols: Tuple[str, ...] = ()
+        # symbol -> (monotonic ts, precio)
+        self._prices: Dict[str, Tuple[float, Decimal]] = {}
 
-        self._last_sl: Decimal = Decimal("0")
-        self._be_done: bool = False
-        self._trail_active: bool = False
-        self._trail_best: Decimal = Decimal("0")
-        self._trail_anchor: Decimal = Decimal("0")
+    def subscribe(self, symbol: str) -> None:
+        with self._lock:
+            if symbol in self._symbols:
+                return
+            self._symbols = self._symbols + (symbol,)
+            self._wake.set()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="price-feed", daemon=True)
+                self._thread.start()
 
-        self._thread.start()
+    def unsubscribe(self, symbol: str) -> None:
+        with self._lock:
+            if symbol not in self._symbols:
+                return
+            self._symbols = tuple(s for s in self._symbols if s != symbol)
+            if not self._symbols:
+                self._wake.clear()
 
     def stop(self) -> None:
         self._stop.set()
+        self._wake.set()
 
-    def set_position(self, pos: Optional[OpenPosition], cfg: Optional[PairConfig]) -> None:
-        with self._lock:
-            self._pos = pos
-            self._cfg = cfg
-            self._last_sl = Decimal("0")
-            self._be_done = False
-            self._trail_active = False
-            self._trail_best = Decimal("0")
-            self._trail_anchor = Decimal("0")
+    def get(self, symbol: str) -> Decimal:
+        hit = self._prices.get(symbol)
+        if hit is not None and time.monotonic() - hit[0] <= self._max_age:
+            return hit[1]
+        price = self.client.get_last_price(symbol)
+        if price > 0:
+            self._prices[symbol] = (time.monotonic(), price)
+        return price
 
     def _loop(self) -> None:
         while not self._stop.is_set():
-            time.sleep(1.0)
+            symbols = self._symbols
+            if not symbols:
+                self._wake.wait()  # nada que vigilar: sin requests hasta subscribe()
+                continue
+            if self._stop.wait(self._refresh):
+                return
+            symbols = self._symbols
+            if not symbols:
+                continue
+            try:
+                prices = self.client.get_last_prices(symbols)
+            except Exception as e:
+                log.warning(f"⚠️ PriceFeed: {e}")
+                continue
+            now = time.monotonic()
+            for sym, price in prices.items():
+                if price > 0:
+                    self._prices[sym] = (now, price)
 
-            with self._lock:
-                pos = self._pos
-                cfg = self._cfg
 
-            if not pos or not cfg:
-                continue
+# ---------------------------- monitor ----------------------------
 
-            if not (cfg.sl_enabled and (cfg.breakeven_enabled or cfg.trailing_enabled)):
-                continue
+# Intervalo adaptativo del monitor (seg): rápido con trailing activo o cerca
+# del trigger, lento cuando el precio está lejos. La posición (REST firmado)
+# se refresca con menos frecuencia que el precio (que sale del PriceFeed).
+_POLL_MIN_SEC = 0.2
+_POLL_BASE_SEC = 1.0
+_POLL_MAX_SEC = 5.0
+_POS_REFRESH_SEC = 5.0
 
-            try:
-                pos_list = self.client.get_pending_positions(pos.symbol)
-                p = next((pp for pp in pos_list if str(pp.get("positionId") or "") == pos.position_id), None)
+
+class PositionBook:
+    """
+    Snapshot de TODAS las posiciones abiertas (get_pending_positions sin
+    symbol: una llamada para todos los monitores), agrupadas por símbolo
+    y por positionId. Solo lo usa el thread del MonitorDispatcher: sin lock.
+    """
+
+    def __init__(self, client: BitunixClient, max_age_sec: float = _POS_REFRESH_SEC) -> None:
+        self.client = client
+        self._max_age = float(max_age_sec)
+        self._ts = 0.0
+        self._by_symbol: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_pid: Dict[str, Dict[str, Any]] = {}
+
+    def get(self, symbol: str, not_before: float) -> Tuple[float, List[Dict[str, Any]]]:
+        """
+        (ts del snapshot, posiciones del símbolo). Refresca si está viejo o
+        es anterior a not_before (p.ej. la posición se abrió después).
+        """
+        now = time.monotonic()
+        if self._ts < not_before or now - self._ts >= self._max_age:
+            by_symbol: Dict[str, List[Dict[str, Any]]] = {}
+            by_pid: Dict[str, Dict[str, Any]] = {}
+            for p in self.client.get_pending_positions():
+                by_symbol.setdefault(str(p.get("symbol") or "").upper(), []).append(p)
+                by_pid[str(p.get("positionId") or "")] = p
+            self._by_symbol = by_symbol
+            self._by_pid = by_pid
+            self._ts = now
+        return self._ts, self._by_symbol.get(symbol, [])
+
+    def position(self, position_id: str) -> Optional[Dict[str, Any]]:
+        """Posición del último snapshot por positionId (llamar tras get)."""
+        return self._by_pid.get(position_id)
+
+
+class SymbolMonitor:
+    """
+    Estado + lógica de BE/trailing de un símbolo. No tiene thread propio:
+    el MonitorDispatcher llama a tick() cuando le toca.
+
+    Sin locks: set_position (worker de la cola) solo publica la tupla
+    (generación, pos, cfg) con una asignación atómica; el estado de BE/
+    trailing lo toca únicamente el thread del dispatcher, que lo resetea al
+    ver una generación nueva.
+    """
+
+    def __init__(self, client: BitunixClient, symbol: str, prices: PriceFeed) -> None:
+        self.client = client
+        self.prices = prices
+        self.symbol = symbol.upper()
+
+        self._gen = itertools.count(1)
+        self._state: Tuple[int, Optional[OpenPosition], Optional[PairConfig]] = (0, None, None)
+
+        # --- solo thread del dispatcher ---
+        self._seen_gen = 0
+        self._closed_gen = -1  # generación cuya posición vimos cerrada
+        self._entry_ok = False
+        self._side = ""
+        # precios/SL en ticks enteros (10**-quote_precision): ver _to_ticks
+        self._last_sl: int = 0
+        self._be_done: bool = False
+        self._trail_active: bool = False
+        self._trail_best: int = 0
+        self._trail_anchor: int = 0
+        self._pos_set_at: float = 0.0
+        self._pos_checked_at: float = 0.0
+
+    def set_position(self, pos: Optional[OpenPosition], cfg: Optional[PairConfig]) -> None:
+        self._state = (next(self._gen), pos, cfg)
+
+    def _reset(self, gen: int, pos: Optional[OpenPosition], cfg: Optional[PairConfig]) -> None:
+        self._seen_gen = gen
+        self._last_sl = 0
+        self._be_done = False
+        self._trail_active = False
+        self._trail_best = 0
+        self._trail_anchor = 0
+        self._pos_set_at = time.monotonic()
+        self._pos_checked_at = 0.0
+        self._precompute(pos, cfg)
+
+    def _precompute(self, pos: Optional[OpenPosition], cfg: Optional[PairConfig]) -> None:
+        """
+        Umbrales de la posición, una vez por set_position (no por tick):
+        triggers y SL de BE en ticks, step/distance en nano-unidades.
+        Entry exacto como fracción en/ed: sin pérdida aunque tenga más
+        decimales que el tick.
+        """
+        self._entry_ok = bool(pos and cfg and pos.entry_price > 0)
+        if not self._entry_ok:
+            return
+
+        self._side = pos.side.upper()
+        en, ed = pos.entry_price.as_integer_ratio()
+        num = en * 10 ** max(0, pos.quote_precision)  # entry en ticks = num / ed
+        den = _PCT_SCALE * ed
+        be_t = _pct_n(cfg.breakeven_trigger_pct)
+        be_o = _pct_n(cfg.breakeven_offset_pct)
+        tr_t = _pct_n(cfg.trailing_trigger_pct)
+
+        if self._side == "LONG":
+            # primer precio (ticks) >= entry * (1 + trigger)
+            self._be_trigger = -(-num * (_PCT_SCALE + be_t) // den)
+            self._trail_trigger = -(-num * (_PCT_SCALE + tr_t) // den)
+            self._be_sl = num * (_PCT_SCALE + be_o) // den
+        else:
+            # último precio (ticks) <= entry * (1 - trigger)
+            self._be_trigger = num * (_PCT_SCALE - be_t) // den
+            self._trail_trigger = num * (_PCT_SCALE - tr_t) // den
+            self._be_sl = num * (_PCT_SCALE - be_o) // den
+
+        self._step_n = _pct_n(cfg.trailing_step_pct)
+        self._dist_n = _pct_n(cfg.trailing_distance_pct)
+
+    def active(self) -> bool:
+        """¿Hay que tickear? Posición viva con SL y BE o trailing activos."""
+        gen, pos, cfg = self._state
+        return bool(
+            pos and cfg and gen != self._closed_gen
+            and cfg.sl_enabled and (cfg.breakeven_enabled or cfg.trailing_enabled)
+        )
+
+    def tick(self, book: PositionBook) -> Optional[float]:
+        """
+        Un ciclo del monitor. Devuelve los segundos hasta el próximo, o None
+        si ya no hay nada que vigilar (el dispatcher lo saca del heap).
+        """
+        gen, pos, cfg = self._state
+        if gen != self._seen_gen:
+            self._reset(gen, pos, cfg)
+
+        if not pos or not cfg or gen == self._closed_gen:
+            return None
+
+        if not (cfg.sl_enabled and (cfg.breakeven_enabled or cfg.trailing_enabled)):
+            return None
+
+        try:
+            snap_ts, pos_list = book.get(pos.symbol, self._pos_set_at)
+            if snap_ts != self._pos_checked_at:  # snapshot nuevo: revisar posición
+                p = book.position(pos.position_id)
 
                 if not p:
                     any_open = any(abs(_d(pp.get("qty"))) > 0 for pp in pos_list)
                     if not any_open:
-                        with self._lock:
-                            self._pos = None
-                        continue
-                    continue
+                        self._closed_gen = gen
+                        return None
+                    return _POLL_BASE_SEC
 
                 remaining = abs(_d(p.get("qty")))
                 if remaining <= 0:
-                    with self._lock:
-                        self._pos = None
-                    continue
+                    self._closed_gen = gen
+                    return None
 
-                curr_sl = _d(p.get("slPrice") or p.get("stopLossPrice") or p.get("sl") or 0)
+                curr_sl = _to_ticks(_d(p.get("slPrice") or p.get("stopLossPrice") or p.get("sl") or 0), pos.quote_precision)
                 if curr_sl > 0 and self._last_sl == 0:
                     self._last_sl = curr_sl
+                self._pos_checked_at = snap_ts
 
-                price = self.client.get_last_price(pos.symbol)
-                if price <= 0:
-                    continue
+            price = self.prices.get(pos.symbol)
+            if price <= 0:
+                return _POLL_BASE_SEC
 
-                if cfg.breakeven_enabled and not self._be_done:
-                    self._maybe_breakeven(pos, cfg, price)
+            px = _to_ticks(price, pos.quote_precision)
+            if cfg.breakeven_enabled and not self._be_done:
+                self._maybe_breakeven(pos, cfg, px)
 
-                if cfg.trailing_enabled:
-                    self._maybe_trailing(pos, cfg, price)
+            if cfg.trailing_enabled:
+                self._maybe_trailing(pos, cfg, px)
 
-            except Exception as e:
-                print(f"⚠️ Monitor {self.symbol}: {e}")
+            return self._next_interval(pos, cfg, price)
 
-    def _tighten_sl(self, pos: OpenPosition, new_sl: Decimal) -> None:
-        s = pos.side.upper()
+        except Exception as e:
+            log.warning(f"⚠️ Monitor {self.symbol}: {e}")
+            return _POLL_BASE_SEC
+
+    def _next_interval(self, pos: OpenPosition, cfg: PairConfig, price: Decimal) -> float:
+        """
+        Intervalo hasta el próximo tick según lo lejos que esté el precio del
+        trigger más cercano (BE pendiente / trailing). Solo heurística de
+        scheduling: float alcanza.
+        """
+        if self._trail_active:
+            return _POLL_MIN_SEC
+
+        entry = float(pos.entry_price)
+        if entry <= 0:
+            return _POLL_BASE_SEC
+
+        triggers = []
+        if cfg.breakeven_enabled and not self._be_done:
+            triggers.append(cfg.breakeven_trigger_pct)
+        if cfg.trailing_enabled:
+            triggers.append(cfg.trailing_trigger_pct)
+        if not triggers:
+            return _POLL_MAX_SEC
+        trigger = min(triggers)
+        if trigger <= 0:
+            return _POLL_MIN_SEC
+
+        # movimiento a favor desde la entrada (fracción) y cuánto falta
+        move = (float(price) - entry) / entry
+        if pos.side.upper() != "LONG":
+            move = -move
+        dist = trigger - move
+        if dist <= 0:
+            return _POLL_MIN_SEC
+        return min(_POLL_MAX_SEC, max(_POLL_MIN_SEC, _POLL_BASE_SEC * dist / trigger))
+
+    def _tighten_sl(self, pos: OpenPosition, new_sl: int, price: Optional[int] = None) -> None:
+        """
+        new_sl y price en ticks. Solo mueve el SL a favor (nunca lo afloja).
+        price = el que ya tiene el tick; si no se pasa, se consulta.
+        """
+        s = self._side
         qp = pos.quote_precision
 
-        try:
-            price = self.client.get_last_price(pos.symbol)
-        except Exception:
-            price = Decimal("0")
+        if price is None:
+            try:
+                price = _to_ticks(self.client.get_last_price(pos.symbol), qp)
+            except Exception:
+                price = 0
 
+        # = clamp_sl_not_instant(..., min_ticks_away=2), en ticks
         if price > 0:
-            new_sl = clamp_sl_not_instant(s, new_sl, price, qp)
+            if s == "LONG":
+                if new_sl >= price - 2:
+                    new_sl = price - 2
+            elif new_sl <= price + 2:
+                new_sl = price + 2
 
         if self._last_sl > 0:
             if s == "LONG" and new_sl <= self._last_sl:
@@ -219,76 +520,63 @@ class SymbolMonitor:
             if s == "SHORT" and new_sl >= self._last_sl:
                 return
 
-        sl_str = fmt_decimal(new_sl, qp)
+        sl_str = _ticks_to_str(new_sl, qp)
         self.client.modify_position_sl(pos.symbol, pos.position_id, sl_str)
         self._last_sl = new_sl
-        print(f"🔒 {pos.symbol} {s}: SL -> {sl_str}")
-
-    def _maybe_breakeven(self, pos: OpenPosition, cfg: PairConfig, price: Decimal) -> None:
-        s = pos.side.upper()
-        entry = pos.entry_price
-        trigger = Decimal(str(cfg.breakeven_trigger_pct))
-        offset = Decimal(str(cfg.breakeven_offset_pct))
+        log.info(f"🔒 {pos.symbol} {s}: SL -> {sl_str}")
 
-        if entry <= 0:
+    def _maybe_breakeven(self, pos: OpenPosition, cfg: PairConfig, price: int) -> None:
+        if not self._entry_ok:
             return
 
+        s = self._side
         if s == "LONG":
-            if price < entry * (Decimal("1") + trigger):
-                return
-            be_sl = entry * (Decimal("1") + offset)
-        else:
-            if price > entry * (Decimal("1") - trigger):
+            if price < self._be_trigger:
                 return
-            be_sl = entry * (Decimal("1") - offset)
+        elif price > self._be_trigger:
+            return
 
-        be_sl = round_down(be_sl, pos.quote_precision)
         try:
-            self._tighten_sl(pos, be_sl)
+            self._tighten_sl(pos, self._be_sl, price)
             self._be_done = True
-            print(f"🟢 {pos.symbol} {s}: breakeven aplicado")
+            log.info(f"🟢 {pos.symbol} {s}: breakeven aplicado")
         except Exception as e:
-            print(f"⚠️ {pos.symbol} {s}: breakeven falló: {e}")
+            log.warning(f"⚠️ {pos.symbol} {s}: breakeven falló: {e}")
 
-    def _maybe_trailing(self, pos: OpenPosition, cfg: PairConfig, price: Decimal) -> None:
+    def _maybe_trailing(self, pos: OpenPosition, cfg: PairConfig, price: int) -> None:
         """Trailing por movimiento de precio (tipo BE).
 
         Activa trailing cuando el precio se aleja de la entrada al menos
         cfg.trailing_trigger_pct (ej: 0.02 = 2%).
         """
-        entry = pos.entry_price
-        if entry <= 0:
+        if not self._entry_ok:
             return
 
-        trigger = Decimal(str(getattr(cfg, 'trailing_trigger_pct', 0.02)))
-        step_pct = Decimal(str(cfg.trailing_step_pct))
-        dist_pct = Decimal(str(cfg.trailing_distance_pct))
-        s = pos.side.upper()
+        s = self._side
+        dist = self._dist_n
 
         # --- Activación por movimiento desde entrada ---
         if not self._trail_active:
             if s == "LONG":
-                if price < entry * (Decimal("1") + trigger):
-                    return
-            else:
-                if price > entry * (Decimal("1") - trigger):
+                if price < self._trail_trigger:
                     return
+            elif price > self._trail_trigger:
+                return
 
             self._trail_active = True
             self._trail_best = price
             self._trail_anchor = price
-            print(f"🚀 {pos.symbol} {s}: trailing ACTIVADO (trigger={trigger})")
+            log.info(f"🚀 {pos.symbol} {s}: trailing ACTIVADO (trigger={cfg.trailing_trigger_pct})")
 
             if cfg.trailing_move_immediately:
                 if s == "LONG":
-                    new_sl = price * (Decimal("1") - dist_pct)
+                    new_sl = price * (_PCT_SCALE - dist) // _PCT_SCALE
                 else:
-                    new_sl = price * (Decimal("1") + dist_pct)
-                new_sl = round_down(new_sl, pos.quote_precision)
+                    new_sl = price * (_PCT_SCALE + dist) // _PCT_SCALE
                 try:
-                    self._tighten_sl(pos, new_sl)
+                    self._tighten_sl(pos, new_sl, price)
                 except Exception as e:
-                    print(f"⚠️ {pos.symbol} {s}: trailing move inmediato falló: {e}")
+                    log.warning(f"⚠️ {pos.symbol} {s}: trailing move inmediato falló: {e}")
             return
 
         # --- Seguimiento ---
@@ -296,56 +584,159 @@ class SymbolMonitor:
             if price > self._trail_best:
                 self._trail_best = price
 
-            if self._trail_best >= self._trail_anchor * (Decimal("1") + step_pct):
-                new_sl = self._trail_best * (Decimal("1") - dist_pct)
-                new_sl = round_down(new_sl, pos.quote_precision)
+            if self._trail_best * _PCT_SCALE >= self._trail_anchor * (_PCT_SCALE + self._step_n):
+                new_sl = self._trail_best * (_PCT_SCALE - dist) // _PCT_SCALE
                 try:
-                    self._tighten_sl(pos, new_sl)
+                    self._tighten_sl(pos, new_sl, price)
                     self._trail_anchor = self._trail_best
                 except Exception as e:
-                    print(f"⚠️ {pos.symbol} LONG trailing falló: {e}")
+                    log.warning(f"⚠️ {pos.symbol} LONG trailing falló: {e}")
         else:
             if self._trail_best == 0 or price < self._trail_best:
                 self._trail_best = price
 
-            if self._trail_best <= self._trail_anchor * (Decimal("1") - step_pct):
-                new_sl = self._trail_best * (Decimal("1") + dist_pct)
-                new_sl = round_down(new_sl, pos.quote_precision)
+            if self._trail_best * _PCT_SCALE <= self._trail_anchor * (_PCT_SCALE - self._step_n):
+                new_sl = self._trail_best * (_PCT_SCALE + dist) // _PCT_SCALE
                 try:
-                    self._tighten_sl(pos, new_sl)
+                    self._tighten_sl(pos, new_sl, price)
                     self._trail_anchor = self._trail_best
                 except Exception as e:
-                    print(f"⚠️ {pos.symbol} SHORT trailing falló: {e}")
+                    log.warning(f"⚠️ {pos.symbol} SHORT trailing falló: {e}")
+
+
+class MonitorDispatcher(threading.Thread):
+    """
+    Un único thread para TODOS los monitores: heap de (próximo tick, symbol).
+    Saca el que vence antes, llama a tick() y lo reprograma con el intervalo
+    que devuelve. Un tick lento (HTTP) retrasa a los demás, pero con pocos
+    símbolos activos es mucho menos costoso que un thread por símbolo.
+
+    Solo están en el heap los monitores activos (ver SymbolMonitor.active):
+    schedule() los mete; cuando tick() devuelve None salen del heap. El
+    PriceFeed sigue al heap: suscrito al entrar, desuscrito al salir (bajo
+    el mismo lock, así una salida y un schedule() no se cruzan).
+    """
+
+    def __init__(self, client: BitunixClient, prices: PriceFeed) -> None:
+        super().__init__(name="monitor-dispatcher", daemon=True)
+        self._book = PositionBook(client)
+        self._prices = prices
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[float, str]] = []
+        self._monitors: Dict[str, SymbolMonitor] = {}
+        # en el heap o en pleno tick
+        self._scheduled: Set[str] = set()
+        self._stopped = False
+
+    def add(self, mon: SymbolMonitor) -> None:
+        with self._cond:
+            self._monitors[mon.symbol] = mon
+
+    def schedule(self, symbol: str) -> None:
+        """Tick inmediato para symbol (si no estaba ya programado)."""
+        with self._cond:
+            if symbol in self._scheduled or symbol not in self._monitors:
+                return
+            self._scheduled.add(symbol)
+            self._prices.subscribe(symbol)
+            heapq.heappush(self._heap, (time.monotonic(), symbol))
+            self._cond.notify()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    due, symbol = self._heap[0]
+                    delay = due - time.monotonic()
+                    if delay <= 0:
+                        heapq.heappop(self._heap)
+                        break
+                    # notify() (add/stop) lo despierta antes de tiempo
+                    self._cond.wait(delay)
+                if self._stopped:
+                    return
+                mon = self._monitors[symbol]
+
+            # fuera del lock: tick() hace I/O
+            interval = mon.tick(self._book)
+
+            with self._cond:
+                if interval is None:
+                    # set_position() durante el tick: schedule() lo vio
+                    # programado y no hizo nada, así que lo re-chequeamos aquí
+                    if not mon.active():
+                        self._scheduled.discard(symbol)
+                        self._prices.unsubscribe(symbol)
+                        continue
+                    interval = 0.0
+                heapq.heappush(self._heap, (time.monotonic() + interval, symbol))
 
 
 # ---------------------------- executor ----------------------------
 
+# precisiones / minTradeVolume casi no cambian: se cachean y se refrescan cada hora
+_SYMBOL_INFO_TTL_SEC = 3600.0
+
+# espera de fill/posición: backoff exponencial (fills rápidos no pagan 1.5s).
+# Tope 2.5s: en 60s son ~28 consultas (antes, cada 1.5s, ~41); no sumamos
+# llamadas contra el rate limit del exchange.
+_WAIT_MIN_SEC = 0.25
+_WAIT_MAX_SEC = 2.5
+_WAIT_FACTOR = 1.5
+
+# una OpenPosition recién leída se reutiliza (flip/reset) sin volver a pedirla
+_POS_FRESH_SEC = 2.0
+
+
 class TradeExecutor:
     def __init__(
         self,
         client: BitunixClient,
-        config_by_symbol: Dict[str, PairConfig],
+        config_by_symbol: Mapping[str, PairConfig],
         margin_coin: str = "USDT",
         tp_sl_stop_type: str = "LAST_PRICE",
         min_ticks_away: int = 2,
     ) -> None:
         self.client = client
-        self.cfgs = {k.upper(): v for k, v in config_by_symbol.items()}
+        # sin copiar: las claves ya vienen en mayúsculas (load_config) y el
+        # mapping es de solo lectura
+        self.cfgs = config_by_symbol
         self.margin_coin = margin_coin
         self.tp_sl_stop_type = tp_sl_stop_type
         self.min_ticks_away = int(min_ticks_away)
 
-        self._monitors_lock = threading.RLock()
+        # solo las altas van con lock; las lecturas (dict.get) no lo necesitan
+        self._monitors_lock = threading.Lock()
         self._monitors: Dict[str, SymbolMonitor] = {}
+        self._prices = PriceFeed(client)
+        self._dispatcher = MonitorDispatcher(client, self._prices)
+        self._dispatcher.start()
+
+        # Pool para solapar requests independientes (latencia = max RTT, no suma)
+        self._io_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="bitunix-io")
+
+        # symbol -> (monotonic ts, info de get_symbol_info)
+        self._sym_info_lock = threading.Lock()
+        self._sym_info: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # precarga en segundo plano (una sola llamada): no retrasa el arranque
+        self._io_pool.submit(self._prefetch_symbol_info)
 
     def process_enqueued_signal(self, sig: EnqueuedSignal) -> None:
         symbol = sig.symbol.upper()
         cfg = self.cfgs.get(symbol)
         if not cfg:
-            print(f"⚠️ {symbol}: no hay config")
+            log.warning(f"⚠️ {symbol}: no hay config")
             return
         if not cfg.is_enabled:
-            print(f"⏭️ {symbol}: deshabilitado")
+            log.info(f"⏭️ {symbol}: deshabilitado")
             return
 
         # Señales soportadas:
@@ -377,7 +768,7 @@ class TradeExecutor:
                 raw = "SHORT"
 
         if raw not in ("LONG", "SHORT", "BUY_TP", "SELL_TP"):
-            print(f"⚠️ {symbol}: señal inválida: {raw}")
+            log.warning(f"⚠️ {symbol}: señal inválida: {raw}")
             return
 
         self._ensure_monitor(symbol)
@@ -391,7 +782,7 @@ class TradeExecutor:
             self._handle_signal(symbol, raw, cfg)
 
         except Exception as e:
-            print(f"❌ {symbol}: error procesando señal {raw}: {e}")
+            log.error(f"❌ {symbol}: error procesando señal {raw}: {e}")
 
     def _handle_tp_close(self, symbol: str, target_side: str) -> None:
         """
@@ -403,45 +794,33 @@ class TradeExecutor:
         """
         cur_pos = self._get_open_position(symbol)
         if not cur_pos:
-            print(f"⏭️ {symbol}: TP {target_side} recibido pero no hay posición abierta")
+            log.info(f"⏭️ {symbol}: TP {target_side} recibido pero no hay posición abierta")
             return
 
         if cur_pos.side.upper() != target_side.upper():
-            print(f"⏭️ {symbol}: TP {target_side} ignorado (posición actual: {cur_pos.side})")
+            log.info(f"⏭️ {symbol}: TP {target_side} ignorado (posición actual: {cur_pos.side})")
             return
 
         # Cancelar TPs pendientes antes de cerrar (evita órdenes colgadas)
-        try:
-            pending = self.client.get_pending_tpsl_orders(symbol=symbol, limit=200)
-        except Exception:
-            pending = []
-
-        for o in pending:
-            # Solo cancelamos TP (no SL) mirando tpPrice
-            tp_price = str(o.get("tpPrice") or "").strip()
-            if not tp_price:
-                continue
-            oid = self.client._extract_id_field(o)
-            if not oid:
-                continue
-            try:
-                self.client.cancel_tpsl_order(symbol, oid)
-            except Exception as e:
-                print(f"⚠️ {symbol}: no pude cancelar TP {oid}: {e}")
+        self._cancel_pending_tps(symbol)
 
-        print(f"✅ {symbol}: TP manual -> cerrando {cur_pos.side}")
+        log.info(f"✅ {symbol}: TP manual -> cerrando {cur_pos.side}")
         self._close_position_market(symbol, cur_pos)
 
     def _handle_signal(self, symbol: str, side: str, cfg: PairConfig) -> None:
+        # margin_mode y leverage son independientes: los lanzamos en paralelo
+        f_margin = self._io_pool.submit(self.client.set_margin_mode, symbol, self.margin_coin, cfg.margin_mode)
+        f_lev = self._io_pool.submit(self.client.set_leverage, symbol, self.margin_coin, int(cfg.leverage))
+
         try:
-            self.client.set_margin_mode(symbol, self.margin_coin, cfg.margin_mode)
+            f_margin.result()
         except Exception as e:
-            print(f"⚠️ {symbol}: no pude set_margin_mode: {e}")
+            log.warning(f"⚠️ {symbol}: no pude set_margin_mode: {e}")
 
         try:
-            self.client.set_leverage(symbol, self.margin_coin, int(cfg.leverage))
+            f_lev.result()
         except Exception as e:
-            print(f"⚠️ {symbol}: no pude set_leverage: {e}")
+            log.warning(f"⚠️ {symbol}: no pude set_leverage: {e}")
 
         cur_pos = self._get_open_position(symbol)
 
@@ -451,36 +830,34 @@ class TradeExecutor:
 
         if cur_pos.side.upper() == side.upper():
             if cfg.same_side_policy.upper() == "IGNORE":
-                print(f"⏭️ {symbol}: ya en {side}. IGNORE")
+                log.info(f"⏭️ {symbol}: ya en {side}. IGNORE")
                 return
-            print(f"🔁 {symbol}: ya en {side}. RESET_ORDERS")
+            log.info(f"🔁 {symbol}: ya en {side}. RESET_ORDERS")
             self._reset_orders(symbol, cur_pos, cfg)
             return
 
-        print(f"🔄 {symbol}: flip {cur_pos.side} -> {side}")
+        log.info(f"🔄 {symbol}: flip {cur_pos.side} -> {side}")
         self._close_position_market(symbol, cur_pos)
         self._open_new_position(symbol, side, cfg)
 
     def _get_open_position(self, symbol: str) -> Optional[OpenPosition]:
         pos_list = self.client.get_pending_positions(symbol)
-        nonzero = [p for p in pos_list if abs(_d(p.get("qty"))) > 0]
+        # (|qty|, p): un solo _d por posición; max = la de mayor qty (1ª si empatan)
+        nonzero = [(q, p) for q, p in ((abs(_d(p.get("qty"))), p) for p in pos_list) if q > 0]
         if not nonzero:
             return None
 
-        nonzero.sort(key=lambda p: abs(_d(p.get("qty"))), reverse=True)
-        p = nonzero[0]
+        qty, p = max(nonzero, key=itemgetter(0))
 
         side = str(p.get("side") or "").upper()
-        if side == "BUY":
-            side = "LONG"
-        if side == "SELL":
-            side = "SHORT"
+        code = _SIDE_CODE.get(side, -1)
+        if code >= 0:
+            side = _SIDE_NAME[code]
 
         position_id = str(p.get("positionId") or "")
-        qty = abs(_d(p.get("qty")))
         entry = _d(p.get("avgOpenPrice") or p.get("entryPrice") or 0)
 
-        info = self.client.get_symbol_info(symbol)
+        info = self._symbol_info(symbol)
         bp = int(info.get("basePrecision", 0))
         qp = int(info.get("quotePrecision", 0))
 
@@ -493,8 +870,39 @@ class TradeExecutor:
             base_precision=bp,
             quote_precision=qp,
             margin_coin=self.margin_coin,
+            fetched_at=time.monotonic(),
         )
 
+    def _fresh_position(self, symbol: str, pos: Optional[OpenPosition]) -> Optional[OpenPosition]:
+        """pos si se leyó hace menos de _POS_FRESH_SEC; si no, se relee por REST."""
+        if pos is not None and time.monotonic() - pos.fetched_at <= _POS_FRESH_SEC:
+            return pos
+        return self._get_open_position(symbol)
+
+    def _symbol_info(self, symbol: str) -> Dict[str, Any]:
+        """get_symbol_info cacheado por símbolo (TTL _SYMBOL_INFO_TTL_SEC)."""
+        hit = self._sym_info.get(symbol)
+        if hit is not None and time.monotonic() - hit[0] < _SYMBOL_INFO_TTL_SEC:
+            return hit[1]
+        info = self.client.get_symbol_info(symbol)
+        with self._sym_info_lock:
+            self._sym_info[symbol] = (time.monotonic(), info)
+        return info
+
+    def _prefetch_symbol_info(self) -> None:
+        symbols = list(self.cfgs)
+        if not symbols:
+            return
+        try:
+            infos = self.client.get_symbols_info(symbols)
+        except Exception as e:
+            log.warning(f"⚠️ No pude precargar info de símbolos: {e}")
+            return
+        now = time.monotonic()
+        with self._sym_info_lock:
+            for sym, info in infos.items():
+                self._sym_info.setdefault(sym, (now, info))
+
     def _calc_qty(self, symbol: str, cfg: PairConfig, last_price: Decimal, base_precision: int, min_trade_volume: Decimal) -> Decimal:
         t = cfg.order_size_type.upper()
         v = Decimal(str(cfg.order_size_value))
@@ -523,7 +931,7 @@ class TradeExecutor:
         return qty
 
     def _open_new_position(self, symbol: str, side: str, cfg: PairConfig) -> None:
-        info = self.client.get_symbol_info(symbol)
+        info = self._symbol_info(symbol)
         bp = int(info.get("basePrecision", 0))
         qp = int(info.get("quotePrecision", 0))
         min_trade_volume = _d(info.get("minTradeVolume") or 0)
@@ -545,7 +953,7 @@ class TradeExecutor:
             sl_prov = clamp_sl_not_instant(side, sl_prov, last_price, qp, self.min_ticks_away)
             sl_prov_str = fmt_decimal(sl_prov, qp)
 
-            print(f"▶️ {symbol}: OPEN {side} MARKET qty={qty_str} con SL provisional={sl_prov_str}")
+            log.info(f"▶️ {symbol}: OPEN {side} MARKET qty={qty_str} con SL provisional={sl_prov_str}")
             out = self.client.open_market_with_provisional_sl(
                 symbol=symbol,
                 qty=qty_str,
@@ -555,7 +963,7 @@ class TradeExecutor:
                 sl_order_type="MARKET",
             )
         else:
-            print(f"▶️ {symbol}: OPEN {side} MARKET qty={qty_str} (sin SL provisional)")
+            log.info(f"▶️ {symbol}: OPEN {side} MARKET qty={qty_str} (sin SL provisional)")
             out = self.client.open_market(symbol=symbol, qty=qty_str, position_side=side, trade_side="OPEN")
 
         order_id = str((out or {}).get("orderId") or "")
@@ -598,20 +1006,14 @@ class TradeExecutor:
                 sl_pos = clamp_sl_not_instant(side, sl_pos, cur, qp, self.min_ticks_away)
 
             sl_pos_str = fmt_decimal(sl_pos, qp)
-            print(f"🛡️ {symbol}: SL de POSICIÓN -> {sl_pos_str}")
+            log.info(f"🛡️ {symbol}: SL de POSICIÓN -> {sl_pos_str}")
             pos_sl_order_id = self.client.ensure_position_sl(symbol, position_id, sl_pos_str, sl_stop_type=self.tp_sl_stop_type)
 
         if cfg.tp_enabled and cfg.tp_levels:
             self._place_tps(symbol, position_id, side, entry_price, bp, qp, pos_qty, cfg.tp_levels)
 
         if prov_ids:
-            for oid in prov_ids:
-                if pos_sl_order_id and oid == pos_sl_order_id:
-                    continue
-                try:
-                    self.client.cancel_tpsl_order(symbol, oid)
-                except Exception as e:
-                    print(f"⚠️ {symbol}: no pude cancelar SL provisional {oid}: {e}")
+            self._cancel_tpsl_orders(symbol, [oid for oid in prov_ids if not (pos_sl_order_id and oid == pos_sl_order_id)], "SL provisional")
 
         self._set_monitor_position(
             symbol,
@@ -628,27 +1030,27 @@ class TradeExecutor:
             cfg,
         )
 
-        print(f"✅ {symbol}: posición {side} lista | positionId={position_id} | qty={pos_qty} | entry={entry_price}")
+        log.info(f"✅ {symbol}: posición {side} lista | positionId={position_id} | qty={pos_qty} | entry={entry_price}")
 
     def _close_position_market(self, symbol: str, pos: OpenPosition) -> None:
         """
         FIX: Bitunix CLOSE requiere position_id y el side de cierre lo maneja el client.
         """
-        # refrescar qty real (por si hubo TPs parciales)
-        cur = self._get_open_position(symbol)
+        # refrescar qty real (por si hubo TPs parciales) salvo que pos sea de recién
+        cur = self._fresh_position(symbol, pos)
         if not cur:
-            print(f"⚠️ {symbol}: no veo posición para cerrar")
+            log.warning(f"⚠️ {symbol}: no veo posición para cerrar")
             self._set_monitor_position(symbol, None, None)
             return
 
         qty = cur.initial_qty
         if qty <= 0:
-            print(f"⚠️ {symbol}: qty=0, nada que cerrar")
+            log.warning(f"⚠️ {symbol}: qty=0, nada que cerrar")
             self._set_monitor_position(symbol, None, None)
             return
 
         qty_str = fmt_decimal(qty, cur.base_precision)
-        print(f"⛔ {symbol}: CLOSE {cur.side} MARKET qty={qty_str}")
+        log.info(f"⛔ {symbol}: CLOSE {cur.side} MARKET qty={qty_str}")
 
         # ✅ FIX REAL: pasamos position_id
         self.client.close_market(
@@ -661,7 +1063,7 @@ class TradeExecutor:
         self._set_monitor_position(symbol, None, None)
 
     def _reset_orders(self, symbol: str, pos: OpenPosition, cfg: PairConfig) -> None:
-        cur = self._get_open_position(symbol)
+        cur = self._fresh_position(symbol, pos)
         if not cur:
             return
 
@@ -671,22 +1073,7 @@ class TradeExecutor:
         qp = cur.quote_precision
         side = cur.side
 
-        try:
-            pending = self.client.get_pending_tpsl_orders(symbol=symbol, limit=200)
-        except Exception:
-            pending = []
-
-        for o in pending:
-            tpp = str(o.get("tpPrice") or "").strip()
-            if not tpp:
-                continue
-            oid = self.client._extract_id_field(o)
-            if not oid:
-                continue
-            try:
-                self.client.cancel_tpsl_order(symbol, oid)
-            except Exception as e:
-                print(f"⚠️ {symbol}: no pude cancelar TP {oid}: {e}")
+        self._cancel_pending_tps(symbol)
 
         if cfg.sl_enabled:
             sl_pct = Decimal(str(cfg.sl_pct))
@@ -701,13 +1088,38 @@ class TradeExecutor:
             try:
                 self.client.ensure_position_sl(symbol, cur.position_id, sl_str, sl_stop_type=self.tp_sl_stop_type)
             except Exception as e:
-                print(f"⚠️ {symbol}: no pude resetear SL: {e}")
+                log.warning(f"⚠️ {symbol}: no pude resetear SL: {e}")
 
         if cfg.tp_enabled and cfg.tp_levels:
             self._place_tps(symbol, cur.position_id, side, entry, bp, qp, qty, cfg.tp_levels)
 
         self._set_monitor_position(symbol, cur, cfg)
 
+    def _cancel_pending_tps(self, symbol: str) -> None:
+        """Cancela los TP pendientes (no SL, se mira tpPrice)."""
+        try:
+            pending = self.client.get_pending_tpsl_orders(symbol=symbol, limit=200)
+        except Exception:
+            pending = []
+
+        extract = self.client._extract_id_field
+        oids = [oid for oid in (extract(o) for o in pending if str(o.get("tpPrice") or "").strip()) if oid]
+        self._cancel_tpsl_orders(symbol, oids, "TP")
+
+    def _cancel_tpsl_orders(self, symbol: str, oids: List[str], what: str) -> None:
+        """
+        Cancela varias órdenes TP/SL en paralelo en _io_pool (Bitunix no tiene
+        cancel en lote para tpsl): latencia ~1 RTT en vez de N.
+        """
+        if not oids:
+            return
+        futs = [self._io_pool.submit(self.client.cancel_tpsl_order, symbol, oid) for oid in oids]
+        for oid, f in zip(oids, futs):
+            try:
+                f.result()
+            except Exception as e:
+                log.warning(f"⚠️ {symbol}: no pude cancelar {what} {oid}: {e}")
+
     def _place_tps(
         self,
         symbol: str,
@@ -723,52 +1135,73 @@ class TradeExecutor:
         if not lv or total_qty <= 0:
             return
 
-        used = Decimal("0")
-        qtys: List[Decimal] = []
+        # Una pasada en enteros: qty en lotes (10^-bp), precios en ticks (10^-qp).
+        # Todo exacto como fracciones (= round_down de Decimal), y solo se
+        # formatean strings para los niveles que se envían.
+        lot = 10 ** max(0, base_precision)
+        S = 10 ** max(0, quote_precision)
+        tn, td = total_qty.as_integer_ratio()
+        en, ed = entry_price.as_integer_ratio()
+        long = side.upper() == "LONG"
 
+        qtys: List[int] = []
         for t in lv:
-            q = round_down(total_qty * Decimal(str(t.close_frac)), base_precision)
-            if q <= 0:
-                q = Decimal("0")
-            qtys.append(q)
-            used += q
+            fn, fd = Decimal(str(t.close_frac)).as_integer_ratio()
+            qtys.append(max(0, tn * fn * lot // (td * fd)))
 
-        runner = round_down(total_qty - used, base_precision)
-        if runner < 0:
-            runner = Decimal("0")
+        runner = max(0, tn * lot // td - sum(qtys))
 
-        info = self.client.get_symbol_info(symbol)
-        min_trade_volume = _d(info.get("minTradeVolume") or 0)
-        if min_trade_volume > 0 and runner > 0 and runner < min_trade_volume and qtys:
-            qtys[-1] = round_down(qtys[-1] + runner, base_precision)
-            runner = Decimal("0")
+        info = self._symbol_info(symbol)
+        mn, md = _d(info.get("minTradeVolume") or 0).as_integer_ratio()
+        if mn > 0 and runner > 0 and runner * md < mn * lot and qtys:
+            qtys[-1] += runner
+            runner = 0
 
+        entry_ticks = en * S // ed
+        sends = []
         for t, q in zip(lv, qtys):
             if q <= 0:
                 continue
-            tp_price = compute_tp_from_entry(entry_price, quote_precision, side, Decimal(str(t.target_pct)))
-            tp_price_str = fmt_decimal(tp_price, quote_precision)
-            tp_qty_str = fmt_decimal(q, base_precision)
+            pn, pd = Decimal(str(t.target_pct)).as_integer_ratio()
+            # = compute_tp_from_entry (nunca del lado malo de la entrada)
+            if long:
+                tp = en * (pd + pn) * S // (ed * pd)
+                if tp * ed <= en * S:
+                    tp = entry_ticks + 1
+            else:
+                tp = en * (pd - pn) * S // (ed * pd)
+                if tp * ed >= en * S:
+                    tp = entry_ticks - 1
+            sends.append((t, _ticks_to_str(tp, quote_precision), _ticks_to_str(q, base_precision)))
+
+        # Los niveles son independientes: se envían en paralelo (latencia ~1 RTT)
+        futs = [
+            self._io_pool.submit(
+                self.client.place_tp_partial,
+                symbol=symbol,
+                position_id=position_id,
+                tp_price=tp_price_str,
+                tp_qty=tp_qty_str,
+                tp_stop_type=self.tp_sl_stop_type,
+                tp_order_type="MARKET",
+            )
+            for _, tp_price_str, tp_qty_str in sends
+        ]
+        for (t, tp_price_str, tp_qty_str), f in zip(sends, futs):
             try:
-                self.client.place_tp_partial(
-                    symbol=symbol,
-                    position_id=position_id,
-                    tp_price=tp_price_str,
-                    tp_qty=tp_qty_str,
-                    tp_stop_type=self.tp_sl_stop_type,
-                    tp_order_type="MARKET",
-                )
-                print(f"🎯 {symbol}: TP{t.level} price={tp_price_str} qty={tp_qty_str}")
+                f.result()
+                log.info(f"🎯 {symbol}: TP{t.level} price={tp_price_str} qty={tp_qty_str}")
             except Exception as e:
-                print(f"⚠️ {symbol}: fallo TP{t.level}: {e}")
+                log.warning(f"⚠️ {symbol}: fallo TP{t.level}: {e}")
 
         if runner > 0:
-            print(f"🏃 {symbol}: runner qty={fmt_decimal(runner, base_precision)} (sin TP)")
+            log.info(f"🏃 {symbol}: runner qty={_ticks_to_str(runner, base_precision)} (sin TP)")
 
     def _wait_order_filled(self, order_id: str, timeout_sec: int = 60) -> Dict[str, Any]:
-        t0 = time.time()
+        deadline = time.monotonic() + timeout_sec
+        delay = _WAIT_MIN_SEC
         last: Dict[str, Any] = {}
-        while time.time() - t0 <= timeout_sec:
+        while time.monotonic() <= deadline:
             od = self.client.get_order_detail(order_id)
             last = od if isinstance(od, dict) else {}
             status = str(last.get("status", "")).upper()
@@ -777,7 +1210,8 @@ class TradeExecutor:
                 return last
             if status == "CANCELED":
                 raise RuntimeError(f"orden {order_id} CANCELED")
-            time.sleep(1.5)
+            time.sleep(delay)
+            delay = min(delay * _WAIT_FACTOR, _WAIT_MAX_SEC)
         return last
 
     def _get_fill_price(self, od: Dict[str, Any]) -> Decimal:
@@ -792,29 +1226,41 @@ class TradeExecutor:
         return Decimal("0")
 
     def _wait_position(self, symbol: str, approx_qty: Decimal, timeout_sec: int, prefer_side: Optional[str]) -> Optional[Dict[str, Any]]:
-        t0 = time.time()
-        while time.time() - t0 <= timeout_sec:
+        deadline = time.monotonic() + timeout_sec
+        delay = _WAIT_MIN_SEC
+        while time.monotonic() <= deadline:
             pos = self.client.get_pending_positions(symbol)
-            nonzero = [p for p in pos if abs(_d(p.get("qty"))) > 0]
+            nonzero = [(q, p) for q, p in ((abs(_d(p.get("qty"))), p) for p in pos) if q > 0]
             if nonzero:
                 candidates = nonzero
                 if prefer_side:
-                    preferred = [p for p in nonzero if side_matches(prefer_side, str(p.get("side", "")))]
+                    pc = side_code(prefer_side)
+                    if pc >= 0:
+                        preferred = [c for c in nonzero if side_code(str(c[1].get("side", ""))) == pc]
+                    else:
+                        preferred = [c for c in nonzero if side_matches(prefer_side, str(c[1].get("side", "")))]
                     if preferred:
                         candidates = preferred
-                candidates.sort(key=lambda p: abs(abs(_d(p.get("qty"))) - approx_qty))
-                return candidates[0]
-            time.sleep(1.5)
+                # la de qty más cercana a approx_qty (1ª si empatan)
+                return min(candidates, key=lambda c: abs(c[0] - approx_qty))[1]
+            time.sleep(delay)
+            delay = min(delay * _WAIT_FACTOR, _WAIT_MAX_SEC)
         return None
 
     def _ensure_monitor(self, symbol: str) -> None:
+        if symbol in self._monitors:  # fast path sin lock
+            return
         with self._monitors_lock:
             if symbol in self._monitors:
                 return
-            self._monitors[symbol] = SymbolMonitor(self.client, symbol)
+            mon = SymbolMonitor(self.client, symbol, self._prices)
+            self._monitors[symbol] = mon
+            self._dispatcher.add(mon)
 
     def _set_monitor_position(self, symbol: str, pos: Optional[OpenPosition], cfg: Optional[PairConfig]) -> None:
-        with self._monitors_lock:
-            mon = self._monitors.get(symbol)
+        mon = self._monitors.get(symbol)
         if mon:
             mon.set_position(pos, cfg)
+            # sin BE/trailing no se programa: cero ticks para ese símbolo
+            if mon.active():
+                self._dispatcher.schedule(symbol)
@@ -22,13 +22,13 @@ from __future__ import annotations
 
 import os
 import sys
+import codecs
 import sqlite3
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from PySide6.QtCore import Qt, QProcess, QTimer, QProcessEnvironment
-from PySide6.QtGui import QStandardItem, QStandardItemModel, QTextCursor
+from PySide6.QtCore import Qt, QProcess, QTimer, QProcessEnvironment, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QTextCursor
 from PySide6.QtWidgets import (
-    QStyledItemDelegate,
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QTextEdit, QTabWidget, QMessageBox,
     QTableView, QHeaderView, QComboBox, QSplitter,
@@ -44,6 +44,9 @@ DEFAULT_APP_PATH = os.path.join(BASE_DIR, "app.py")
 
 PYTHON_EXE = sys.executable
 
+# líneas que guarda el panel de logs (Qt recorta las más viejas)
+LOG_MAX_LINES = 5000
+
 
 # --------------------------- DB columns ---------------------------
 
@@ -80,12 +83,61 @@ TP_COLUMNS = [
     ("is_enabled", "enabled (0/1)", "bool01"),
 ]
 
+# SQL constante (se arma una vez): con la conexión persistente de la GUI,
+# la caché de sentencias de sqlite3 reutiliza el statement preparado.
+# Metadatos en tuplas paralelas (nombre / etiqueta / tipo), una vez al importar:
+# los bucles de fill/collect/validate indexan en vez de desempaquetar tuplas.
+PAIRS_COL_NAMES, PAIRS_COL_LABELS, PAIRS_COL_FTYPES = map(tuple, zip(*PAIRS_COLUMNS))
+TP_COL_NAMES, TP_COL_LABELS, TP_COL_FTYPES = map(tuple, zip(*TP_COLUMNS))
+
+# nombre -> índice de columna (sin scans por nombre en los bucles)
+PAIRS_IDX = {name: i for i, name in enumerate(PAIRS_COL_NAMES)}
+TP_IDX = {name: i for i, name in enumerate(TP_COL_NAMES)}
+
+PAIRS_IDX_SYM = PAIRS_IDX["symbol"]
+PAIRS_IDX_OST = PAIRS_IDX["order_size_type"]
+PAIRS_IDX_OSV = PAIRS_IDX["order_size_value"]
+TP_IDX_SYM = TP_IDX["symbol"]
+TP_IDX_LEVEL = TP_IDX["level"]
+
+# SELECT con el mismo orden que *_COLUMNS: las filas se leen por posición
+PAIRS_SELECT_SQL = f"SELECT {','.join(PAIRS_COL_NAMES)} FROM pairs_config ORDER BY symbol"
+TP_SELECT_SQL = f"SELECT {','.join(TP_COL_NAMES)} FROM tp_levels"
+
+PAIRS_INSERT_SQL = (
+    f"INSERT OR REPLACE INTO pairs_config ({','.join(PAIRS_COL_NAMES)}) "
+    f"VALUES ({','.join('?' * len(PAIRS_COL_NAMES))})"
+)
+# UNIQUE(symbol, level): el REPLACE ya pisa el nivel existente
+TP_INSERT_SQL = (
+    f"INSERT OR REPLACE INTO tp_levels ({','.join(TP_COL_NAMES)}) "
+    f"VALUES ({','.join('?' * len(TP_COL_NAMES))})"
+)
+
+
+# valores válidos (mismos CHECK que la DB)
+_MARGIN_MODES = frozenset(("ISOLATION", "CROSS"))
+_ORDER_SIZE_TYPES = frozenset(("MARGIN_USDT", "NOTIONAL_USDT", "PCT_BALANCE"))
+_SAME_SIDE_POLICIES = frozenset(("IGNORE", "RESET_ORDERS"))
+_PCT_VALIDATION_KEYS = (
+    "sl_pct",
+    "breakeven_trigger_pct", "breakeven_offset_pct",
+    "trailing_trigger_pct",
+    "trailing_step_pct", "trailing_distance_pct",
+)
+
 
 # --------------------------- Conversions ---------------------------
 
 def _to_float(x: Any) -> float:
     if x is None:
         return 0.0
+    # sqlite devuelve int/float nativos: sin pasar por str
+    t = type(x)
+    if t is float:
+        return x
+    if t is int:
+        return float(x)
     try:
         s = str(x).strip().replace(",", ".")
         if s == "":
@@ -96,19 +148,28 @@ def _to_float(x: Any) -> float:
 
 
 def _to_int(x: Any) -> int:
+    t = type(x)
+    if t is int:
+        return x
     try:
+        if t is float:
+            return int(x)
         return int(float(str(x).strip().replace(",", ".")))
     except Exception:
         return 0
 
 
+_TRUE_SET = frozenset(("1", "true", "t", "yes", "y", "on", "enabled", "enable"))
+_FALSE_SET = frozenset(("0", "false", "f", "no", "n", "off", "disabled", "disable"))
+
+
 def _to_bool01(x: Any) -> int:
     if x is None:
         return 0
     s = str(x).strip().lower()
-    if s in ("1", "true", "t", "yes", "y", "on", "enabled", "enable"):
+    if s in _TRUE_SET:
         return 1
-    if s in ("0", "false", "f", "no", "n", "off", "disabled", "disable"):
+    if s in _FALSE_SET:
         return 0
     try:
         v = int(float(s.replace(",", ".")))
@@ -117,32 +178,62 @@ def _to_bool01(x: Any) -> int:
         return 0
 
 
+def _pct_ui_to_db(value: Any) -> float:
+    return _to_float(value) / 100.0
+
+
+def _str_ui_to_db(value: Any) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _pct_db_to_ui(value: Any) -> str:
+    return str(_to_float(value) * 100.0)
+
+
+def _bool01_db_to_ui(value: Any) -> str:
+    return "Enabled" if _to_bool01(value) else "Disabled"
+
+
+def _int_db_to_ui(value: Any) -> str:
+    return str(_to_int(value))
+
+
+def _float_db_to_ui(value: Any) -> str:
+    return str(_to_float(value))
+
+
+# ftype -> conversor (un lookup en vez de la cadena de if por celda)
+_UI_TO_DB = {
+    "pct": _pct_ui_to_db,
+    "fracpct": _pct_ui_to_db,
+    "bool01": _to_bool01,
+    "int": _to_int,
+    "float": _to_float,
+}
+_DB_TO_UI = {
+    "pct": _pct_db_to_ui,
+    "fracpct": _pct_db_to_ui,
+    "bool01": _bool01_db_to_ui,
+    "int": _int_db_to_ui,
+    "float": _float_db_to_ui,
+}
+
+
 def ui_to_db(value: Any, ftype: str) -> Any:
-    if ftype == "pct":
-        return _to_float(value) / 100.0
-    if ftype == "fracpct":
-        return _to_float(value) / 100.0
-    if ftype == "bool01":
-        return _to_bool01(value)
-    if ftype == "int":
-        return _to_int(value)
-    if ftype == "float":
-        return _to_float(value)
-    return ("" if value is None else str(value).strip())
+    return _UI_TO_DB.get(ftype, _str_ui_to_db)(value)
 
 
 def db_to_ui(value: Any, ftype: str) -> str:
     if value is None:
         return ""
-    if ftype in ("pct", "fracpct"):
-        return str(_to_float(value) * 100.0)
-    if ftype == "bool01":
-        return "Enabled" if _to_bool01(value) else "Disabled"
-    if ftype == "int":
-        return str(_to_int(value))
-    if ftype == "float":
-        return str(_to_float(value))
-    return str(value)
+    return _DB_TO_UI.get(ftype, str)(value)
+
+
+# conversor por columna, ya resuelto (los bucles no miran ftype)
+PAIRS_COL_UI_TO_DB = tuple(_UI_TO_DB.get(f, _str_ui_to_db) for f in PAIRS_COL_FTYPES)
+PAIRS_COL_DB_TO_UI = tuple(_DB_TO_UI.get(f, str) for f in PAIRS_COL_FTYPES)
+TP_COL_UI_TO_DB = tuple(_UI_TO_DB.get(f, _str_ui_to_db) for f in TP_COL_FTYPES)
+TP_COL_DB_TO_UI = tuple(_DB_TO_UI.get(f, str) for f in TP_COL_FTYPES)
 
 
 def order_size_value_ui_to_db(order_size_type: str, ui_value: Any) -> float:
@@ -161,43 +252,100 @@ def order_size_value_db_to_ui(order_size_type: str, db_value: Any) -> str:
     return str(v)
 
 
+# --------------------------- Models ---------------------------
 
-# --------------------------- Delegates ---------------------------
-
-class BoolComboDelegate(QStyledItemDelegate):
-    """Editor tipo combo para columnas booleanas (Enabled/Disabled)."""
+class ConfigTableModel(QAbstractTableModel):
+    """
+    Modelo de tabla sobre una lista de filas de texto (una lista de str por
+    fila): sin un QStandardItem por celda, la vista lee _rows directamente.
+    Las columnas bool01 son checkbox (CheckStateRole): Qt pinta el check sin
+    crear ningún editor; la celda sigue guardando "Enabled"/"Disabled".
+    """
 
-    def __init__(self, parent=None):
+    def __init__(self, labels: Tuple[str, ...], ftypes: Tuple[str, ...], parent=None):
         super().__init__(parent)
+        self._labels = labels
+        self._bool_cols = frozenset(i for i, f in enumerate(ftypes) if f == "bool01")
+        self._rows: List[List[str]] = []
+
+    def rowCount(self, parent=QModelIndex()):  # type: ignore[override]
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):  # type: ignore[override]
+        return 0 if parent.isValid() else len(self._labels)
+
+    def data(self, index, role=Qt.DisplayRole):  # type: ignore[override]
+        if role == Qt.DisplayRole or role == Qt.EditRole:
+            return self._rows[index.row()][index.column()]
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignCenter)
+        if role == Qt.CheckStateRole and index.column() in self._bool_cols:
+            return Qt.Checked if self._rows[index.row()][index.column()] == "Enabled" else Qt.Unchecked
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):  # type: ignore[override]
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self._labels[section]
+        return None
+
+    def flags(self, index):  # type: ignore[override]
+        if index.column() in self._bool_cols:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.EditRole):  # type: ignore[override]
+        if not index.isValid():
+            return False
+        if role == Qt.CheckStateRole and index.column() in self._bool_cols:
+            # PySide6 puede entregar el estado como int
+            txt = "Enabled" if Qt.CheckState(value) == Qt.Checked else "Disabled"
+        elif role == Qt.EditRole:
+            txt = "" if value is None else str(value)
+        else:
+            return False
+        row = self._rows[index.row()]
+        if row[index.column()] != txt:
+            row[index.column()] = txt
+            self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole, Qt.CheckStateRole])
+        return True
+
+    # ---- API para BotGUI ----
+
+    def set_rows(self, rows: List[List[str]]) -> None:
+        """Reemplaza todas las filas (un solo reset, la vista re-lee una vez)."""
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def append_row(self, row: List[str]) -> None:
+        n = len(self._rows)
+        self.beginInsertRows(QModelIndex(), n, n)
+        self._rows.append(row)
+        self.endInsertRows()
+
+    def remove_row(self, row: int) -> None:
+        if 0 <= row < len(self._rows):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._rows[row]
+            self.endRemoveRows()
+
+    def text(self, row: int, col: int) -> str:
+        return self._rows[row][col]
+
+    def rows(self) -> List[List[str]]:
+        return self._rows
 
-    def createEditor(self, parent, option, index):  # type: ignore[override]
-        combo = QComboBox(parent)
-        combo.addItems(["Disabled", "Enabled"])
-        combo.setEditable(False)
-        return combo
-
-    def setEditorData(self, editor, index):  # type: ignore[override]
-        if not isinstance(editor, QComboBox):
-            return super().setEditorData(editor, index)
-        v = str(index.data() or "").strip().lower()
-        enabled = v in ("1", "true", "enabled", "on", "yes", "y")
-        editor.setCurrentIndex(1 if enabled else 0)
-
-    def setModelData(self, editor, model, index):  # type: ignore[override]
-        if not isinstance(editor, QComboBox):
-            return super().setModelData(editor, model, index)
-        model.setData(index, editor.currentText())
-
-    def displayText(self, value, locale):  # type: ignore[override]
-        v = str(value or "").strip().lower()
-        enabled = v in ("1", "true", "enabled", "on", "yes", "y")
-        return "Enabled" if enabled else "Disabled"
 
 # --------------------------- DB helpers ---------------------------
 
 def connect_db(db_path: str) -> sqlite3.Connection:
     conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    # GUI de un solo usuario: WAL + sync NORMAL (sin fsync por commit),
+    # temporales en memoria y 8 MB de caché de páginas
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-8192")
     return conn
 
 
@@ -207,33 +355,26 @@ def ensure_tables_exist(conn: sqlite3.Connection) -> None:
         cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (t,))
         if not cur.fetchone():
             raise RuntimeError(f"No existe la tabla '{t}' en la DB.")
+    # índice parcial y cubriente para el JOIN de TPs enabled de config_db (el
+    # bot abre la DB en solo lectura): se crea acá, desde la GUI
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tp_levels_enabled"
+        " ON tp_levels(symbol COLLATE NOCASE, level, target_pct, close_frac, is_enabled)"
+        " WHERE is_enabled = 1"
+    )
+    conn.commit()
 
 
-def load_pairs(conn: sqlite3.Connection) -> List[sqlite3.Row]:
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM pairs_config ORDER BY symbol")
-    return cur.fetchall()
+def load_pairs(conn: sqlite3.Connection) -> List[Tuple[Any, ...]]:
+    """Filas en el orden de PAIRS_COLUMNS."""
+    return conn.execute(PAIRS_SELECT_SQL).fetchall()
 
 
-def load_tp_levels(conn: sqlite3.Connection, symbol: Optional[str] = None) -> List[sqlite3.Row]:
-    cur = conn.cursor()
+def load_tp_levels(conn: sqlite3.Connection, symbol: Optional[str] = None) -> List[Tuple[Any, ...]]:
+    """Filas en el orden de TP_COLUMNS."""
     if symbol:
-        cur.execute("SELECT * FROM tp_levels WHERE symbol=? ORDER BY level", (symbol.upper(),))
-    else:
-        cur.execute("SELECT * FROM tp_levels ORDER BY symbol, level")
-    return cur.fetchall()
-
-
-def upsert_pair(conn: sqlite3.Connection, row: Dict[str, Any]) -> None:
-    cols = [c[0] for c in PAIRS_COLUMNS]
-    symbol = (row.get("symbol") or "").upper().strip()
-    if not symbol:
-        raise ValueError("symbol vacío")
-
-    placeholders = ",".join(["?"] * len(cols))
-    sql = f"INSERT OR REPLACE INTO pairs_config ({','.join(cols)}) VALUES ({placeholders})"
-    values = [row.get(c) for c in cols]
-    conn.execute(sql, values)
+        return conn.execute(TP_SELECT_SQL + " WHERE symbol=? ORDER BY level", (symbol.upper(),)).fetchall()
+    return conn.execute(TP_SELECT_SQL + " ORDER BY symbol, level").fetchall()
 
 
 def delete_pair(conn: sqlite3.Connection, symbol: str) -> None:
@@ -244,21 +385,6 @@ def delete_pair(conn: sqlite3.Connection, symbol: str) -> None:
     conn.execute("DELETE FROM tp_levels WHERE symbol=?", (sym,))
 
 
-def upsert_tp(conn: sqlite3.Connection, row: Dict[str, Any]) -> None:
-    sym = (row.get("symbol") or "").upper().strip()
-    lvl = int(row.get("level") or 0)
-    if not sym or lvl <= 0:
-        raise ValueError("TP: symbol vacío o level inválido")
-
-    conn.execute("DELETE FROM tp_levels WHERE symbol=? AND level=?", (sym, lvl))
-
-    cols = [c[0] for c in TP_COLUMNS]
-    placeholders = ",".join(["?"] * len(cols))
-    sql = f"INSERT INTO tp_levels ({','.join(cols)}) VALUES ({placeholders})"
-    values = [row.get(c) for c in cols]
-    conn.execute(sql, values)
-
-
 def delete_tp(conn: sqlite3.Connection, symbol: str, level: int) -> None:
     sym = (symbol or "").upper().strip()
     lvl = int(level or 0)
@@ -279,13 +405,36 @@ class BotGUI(QMainWindow):
         self.app_path = DEFAULT_APP_PATH
 
         self.process: Optional[QProcess] = None
+        # Restart pedido mientras el proceso se cierra: arranca en finished
+        self._restart_pending = False
+
+        # una sola conexión para toda la sesión (se abre al primer uso y se
+        # reemplaza en pick_db): sin open/close ni re-prepare por click
+        self.conn: Optional[sqlite3.Connection] = None
+
+        # Reload: (mtime_ns, size) de la DB y su -wal en la última carga; si no
+        # cambió y no hay ediciones sin guardar en las tablas, no se re-lee
+        self._db_stamp: Tuple[int, ...] = ()
+        self._ui_dirty = False
+
+        # Logs: decoder incremental (un emoji partido entre lecturas no se
+        # corrompe) y volcado agrupado al QTextEdit cada 50 ms
+        self._utf8_dec = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._log_pending: List[str] = []
+        self._log_timer = QTimer(self)
+        self._log_timer.setSingleShot(True)
+        self._log_timer.setInterval(50)
+        self._log_timer.timeout.connect(self._flush_log)
 
         self._build_ui()
         self._refresh_all()
 
+        # estado: se actualiza al cambiar el QProcess; el timer es solo respaldo
+        self._last_running: Optional[bool] = None
         self.timer = QTimer(self)
         self.timer.timeout.connect(self._update_running_label)
-        self.timer.start(400)
+        self.timer.start(1000)
+        self._update_running_label()
 
     # ---------- UI ----------
 
@@ -344,6 +493,9 @@ class BotGUI(QMainWindow):
         self.txt_logs = QTextEdit()
         self.txt_logs.setReadOnly(True)
         self.txt_logs.setLineWrapMode(QTextEdit.NoWrap)
+        # solo se agrega al final: tope de memoria fijo y sin pila de undo
+        self.txt_logs.document().setMaximumBlockCount(LOG_MAX_LINES)
+        self.txt_logs.setUndoRedoEnabled(False)
         layout.addWidget(self.txt_logs, 1)
 
     def _build_config_tab(self) -> None:
@@ -354,7 +506,7 @@ class BotGUI(QMainWindow):
 
         self.btn_reload_db = QPushButton("Reload DB")
         self.btn_save_db = QPushButton("Save DB")
-        self.btn_reload_db.clicked.connect(self._refresh_all)
+        self.btn_reload_db.clicked.connect(lambda: self._refresh_all())
         self.btn_save_db.clicked.connect(self.save_all)
 
         bar.addWidget(self.btn_reload_db)
@@ -382,8 +534,8 @@ class BotGUI(QMainWindow):
         pairs_bar.addWidget(self.btn_add_pair)
         pairs_bar.addWidget(self.btn_del_pair)
 
-        self.pairs_model = QStandardItemModel(0, len(PAIRS_COLUMNS))
-        self.pairs_model.setHorizontalHeaderLabels([c[1] for c in PAIRS_COLUMNS])
+        self.pairs_model = ConfigTableModel(PAIRS_COL_LABELS, PAIRS_COL_FTYPES, self)
+        self._watch_edits(self.pairs_model)
 
         self.tbl_pairs = QTableView()
         self.tbl_pairs.setModel(self.pairs_model)
@@ -394,13 +546,9 @@ class BotGUI(QMainWindow):
         self.tbl_pairs.setStyleSheet("QTableView{gridline-color:#B0B0B0;} QTableView::item{border-right:1px solid #B0B0B0; border-bottom:1px solid #B0B0B0;} QHeaderView::section{border:1px solid #B0B0B0; padding:4px;}")
         self.tbl_pairs.verticalHeader().setVisible(False)
 
-        # Delegates: columnas bool01 como combo Enabled/Disabled
-        self._bool_delegate = BoolComboDelegate(self.tbl_pairs)
-        for cidx, c in enumerate(PAIRS_COLUMNS):
-            if c[2] == "bool01":
-                self.tbl_pairs.setItemDelegateForColumn(cidx, self._bool_delegate)
-
-        self.tbl_pairs.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        # anchos a mano: se miden una vez tras cada carga (resizeColumnsToContents),
+        # no en cada cambio de celda como con ResizeToContents
+        self.tbl_pairs.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.tbl_pairs.horizontalHeader().setStretchLastSection(True)
         self.tbl_pairs.setSelectionBehavior(QTableView.SelectRows)
         self.tbl_pairs.setSelectionMode(QTableView.SingleSelection)
@@ -429,8 +577,8 @@ class BotGUI(QMainWindow):
         tp_bar.addWidget(self.btn_add_tp)
         tp_bar.addWidget(self.btn_del_tp)
 
-        self.tp_model = QStandardItemModel(0, len(TP_COLUMNS))
-        self.tp_model.setHorizontalHeaderLabels([c[1] for c in TP_COLUMNS])
+        self.tp_model = ConfigTableModel(TP_COL_LABELS, TP_COL_FTYPES, self)
+        self._watch_edits(self.tp_model)
 
         self.tbl_tp = QTableView()
         self.tbl_tp.setModel(self.tp_model)
@@ -441,11 +589,7 @@ class BotGUI(QMainWindow):
         self.tbl_tp.setStyleSheet("QTableView{gridline-color:#B0B0B0;} QTableView::item{border-right:1px solid #B0B0B0; border-bottom:1px solid #B0B0B0;} QHeaderView::section{border:1px solid #B0B0B0; padding:4px;}")
         self.tbl_tp.verticalHeader().setVisible(False)
 
-        for cidx, c in enumerate(TP_COLUMNS):
-            if c[2] == "bool01":
-                self.tbl_tp.setItemDelegateForColumn(cidx, self._bool_delegate)
-
-        self.tbl_tp.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.tbl_tp.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.tbl_tp.horizontalHeader().setStretchLastSection(True)
         self.tbl_tp.setSelectionBehavior(QTableView.SelectRows)
         self.tbl_tp.setSelectionMode(QTableView.SingleSelection)
@@ -456,6 +600,15 @@ class BotGUI(QMainWindow):
     # ---------- Logging ----------
 
     def _log(self, s: str) -> None:
+        self._log_pending.append(s)
+        if not self._log_timer.isActive():
+            self._log_timer.start()
+
+    def _flush_log(self) -> None:
+        if not self._log_pending:
+            return
+        s = "".join(self._log_pending)
+        self._log_pending.clear()
         self.txt_logs.moveCursor(QTextCursor.End)
         self.txt_logs.insertPlainText(s)
         self.txt_logs.moveCursor(QTextCursor.End)
@@ -473,6 +626,7 @@ class BotGUI(QMainWindow):
 
         p = QProcess(self)
         p.setProgram(PYTHON_EXE)
+        self._utf8_dec.reset()
 
         # ✅ -u = unbuffered (logs en vivo)
         p.setArguments(["-u", self.app_path])
@@ -490,7 +644,8 @@ class BotGUI(QMainWindow):
 
         # leemos solo stdout (ya incluye stderr)
         p.readyReadStandardOutput.connect(lambda: self._read_proc(p))
-        p.finished.connect(lambda *_: self._log("\n🛑 Bot process finished.\n"))
+        p.finished.connect(lambda *_: self._on_proc_finished())
+        p.stateChanged.connect(lambda _st: self._update_running_label())
 
         self.process = p
         p.start()
@@ -508,27 +663,86 @@ class BotGUI(QMainWindow):
             return
 
         self._log("⛔ STOP bot...\n")
-        self.process.terminate()
-        if not self.process.waitForFinished(2500):
+        # sin waitForFinished: la GUI sigue viva mientras el proceso cierra;
+        # si a los 2.5 s sigue ahí, kill()
+        p = self.process
+        p.terminate()
+        QTimer.singleShot(2500, lambda: self._force_kill_if_alive(p))
+
+    def _force_kill_if_alive(self, p: QProcess) -> None:
+        # solo el proceso al que se le pidió parar (no uno arrancado después)
+        if p is self.process and p.state() != QProcess.NotRunning:
             self._log("⚠️ No terminó con terminate(). Haciendo kill()...\n")
-            self.process.kill()
-            self.process.waitForFinished(2500)
+            p.kill()
 
     def restart_bot(self) -> None:
+        if not self.process or self.process.state() == QProcess.NotRunning:
+            self.start_bot()
+            return
+        self._restart_pending = True
         self.stop_bot()
-        self.start_bot()
+
+    def _on_proc_finished(self) -> None:
+        self._log("\n🛑 Bot process finished.\n")
+        if self._restart_pending:
+            self._restart_pending = False
+            self.start_bot()
 
     def _read_proc(self, proc: QProcess) -> None:
-        data = proc.readAllStandardOutput()
-        text = bytes(data).decode("utf-8", errors="replace")
-        self._log(text)
+        text = self._utf8_dec.decode(proc.readAllStandardOutput().data(), final=False)
+        if text:
+            self._log(text)
 
     def _update_running_label(self) -> None:
         running = bool(self.process and self.process.state() != QProcess.NotRunning)
+        if running == self._last_running:
+            return
+        self._last_running = running
         self.lbl_status.setText("Status: RUNNING" if running else "Status: STOPPED")
         self.btn_start.setEnabled(not running)
         self.btn_stop.setEnabled(running)
 
+    # ---------- DB ----------
+
+    def _db(self) -> sqlite3.Connection:
+        # el esquema se valida una vez al abrir (no en cada operación)
+        if self.conn is None:
+            conn = connect_db(self.db_path)
+            try:
+                ensure_tables_exist(conn)
+            except Exception:
+                conn.close()
+                raise
+            self.conn = conn
+        return self.conn
+
+    def _close_db(self) -> None:
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
+
+    def _current_db_stamp(self) -> Tuple[int, ...]:
+        # en WAL los commits van al -wal: el .db solo cambia al hacer checkpoint
+        out: List[int] = []
+        for path in (self.db_path, self.db_path + "-wal"):
+            try:
+                st = os.stat(path)
+                out += (st.st_mtime_ns, st.st_size)
+            except OSError:
+                out += (0, 0)
+        return tuple(out)
+
+    def _watch_edits(self, model: ConfigTableModel) -> None:
+        def mark(*_: Any) -> None:
+            self._ui_dirty = True
+
+        model.dataChanged.connect(mark)
+        model.rowsInserted.connect(mark)
+        model.rowsRemoved.connect(mark)
+
     # ---------- Pickers ----------
 
     def pick_db(self) -> None:
@@ -537,9 +751,10 @@ class BotGUI(QMainWindow):
             "SQLite DB (*.db *.sqlite);;All (*.*)"
         )
         if path:
+            self._close_db()
             self.db_path = path
             self._update_paths_label()
-            self._refresh_all()
+            self._refresh_all(force=True)
 
     def pick_app(self) -> None:
         path, _ = QFileDialog.getOpenFileName(
@@ -556,10 +771,12 @@ class BotGUI(QMainWindow):
 
     # ---------- Load/refresh ----------
 
-    def _refresh_all(self) -> None:
+    def _refresh_all(self, force: bool = False) -> None:
         try:
-            conn = connect_db(self.db_path)
-            ensure_tables_exist(conn)
+            stamp = self._current_db_stamp()
+            if not force and not self._ui_dirty and stamp == self._db_stamp:
+                return
+            conn = self._db()
 
             pairs = load_pairs(conn)
             self._fill_pairs(pairs)
@@ -568,38 +785,38 @@ class BotGUI(QMainWindow):
             if self.cmb_symbol.count() > 0:
                 self._load_tp_for_symbol(self.cmb_symbol.currentText())
             else:
-                self.tp_model.removeRows(0, self.tp_model.rowCount())
+                self.tp_model.set_rows([])
+
+            self._db_stamp = stamp
+            self._ui_dirty = False
 
         except Exception as e:
             QMessageBox.critical(self, "DB Error", str(e))
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
 
-    def _fill_pairs(self, rows: List[sqlite3.Row]) -> None:
-        self.pairs_model.removeRows(0, self.pairs_model.rowCount())
+    def _fill_pairs(self, rows: List[Tuple[Any, ...]]) -> None:
+        out: List[List[str]] = []
         for r in rows:
-            row_map = {k: r[k] for k in r.keys()}
-            ost = str(row_map.get("order_size_type") or "")
-            osv_ui = order_size_value_db_to_ui(ost, row_map.get("order_size_value"))
-
-            items: List[QStandardItem] = []
-            for col_name, _label, ftype in PAIRS_COLUMNS:
-                if col_name == "order_size_value":
-                    txt = osv_ui
+            osv_ui = order_size_value_db_to_ui(str(r[PAIRS_IDX_OST] or ""), r[PAIRS_IDX_OSV])
+
+            txts: List[str] = []
+            for cidx, conv in enumerate(PAIRS_COL_DB_TO_UI):
+                if cidx == PAIRS_IDX_OSV:
+                    txts.append(osv_ui)
                 else:
-                    txt = db_to_ui(row_map.get(col_name), ftype)
-                it = QStandardItem(txt)
-                it.setTextAlignment(Qt.AlignCenter)
-                items.append(it)
-            self.pairs_model.appendRow(items)
-
-    def _fill_symbol_combo(self, pair_rows: List[sqlite3.Row]) -> None:
-        syms = [str(r["symbol"]).upper() for r in pair_rows if str(r["symbol"] or "").strip() != ""]
+                    v = r[cidx]
+                    txts.append("" if v is None else conv(v))
+            out.append(txts)
+        self.pairs_model.set_rows(out)
+        self.tbl_pairs.resizeColumnsToContents()
+
+    def _fill_symbol_combo(self, pair_rows: List[Tuple[Any, ...]]) -> None:
+        syms = [str(r[PAIRS_IDX_SYM]).upper() for r in pair_rows if str(r[PAIRS_IDX_SYM] or "").strip() != ""]
         cur = self.cmb_symbol.currentText().upper().strip()
 
+        # misma lista (lo normal tras Save/Reload): no se tocan los items
+        if [self.cmb_symbol.itemText(i) for i in range(self.cmb_symbol.count())] == syms:
+            return
+
         self.cmb_symbol.blockSignals(True)
         self.cmb_symbol.clear()
         self.cmb_symbol.addItems(syms)
@@ -609,41 +826,26 @@ class BotGUI(QMainWindow):
 
     def _load_tp_for_symbol(self, symbol: str) -> None:
         sym = (symbol or "").upper().strip()
-        self.tp_model.removeRows(0, self.tp_model.rowCount())
         if not sym:
+            self.tp_model.set_rows([])
             return
 
         try:
-            conn = connect_db(self.db_path)
-            ensure_tables_exist(conn)
+            conn = self._db()
             tps = load_tp_levels(conn, sym)
 
-            for r in tps:
-                row_map = {k: r[k] for k in r.keys()}
-                items: List[QStandardItem] = []
-                for col_name, _label, ftype in TP_COLUMNS:
-                    it = QStandardItem(db_to_ui(row_map.get(col_name), ftype))
-                    it.setTextAlignment(Qt.AlignCenter)
-                    items.append(it)
-                self.tp_model.appendRow(items)
+            out = [["" if v is None else conv(v) for v, conv in zip(r, TP_COL_DB_TO_UI)] for r in tps]
+            self.tp_model.set_rows(out)
+            self.tbl_tp.resizeColumnsToContents()
 
         except Exception as e:
             QMessageBox.critical(self, "DB Error", str(e))
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
 
     def _on_pair_selected(self) -> None:
         idx = self.tbl_pairs.currentIndex()
         if not idx.isValid():
             return
-        row = idx.row()
-        sym_item = self.pairs_model.item(row, 0)
-        if not sym_item:
-            return
-        sym = sym_item.text().upper().strip()
+        sym = self.pairs_model.text(idx.row(), PAIRS_IDX_SYM).upper().strip()
         if sym:
             self.cmb_symbol.setCurrentText(sym)
 
@@ -652,31 +854,26 @@ class BotGUI(QMainWindow):
     def add_pair_row(self) -> None:
         defaults: Dict[str, str] = {
             "symbol": "NEWPAIRUSDT",
-            "is_enabled": "1",
+            "is_enabled": "Enabled",
             "margin_mode": "ISOLATION",
             "leverage": "10",
             "order_size_type": "MARGIN_USDT",
             "order_size_value": "5",
-            "sl_enabled": "1",
+            "sl_enabled": "Enabled",
             "sl_pct": "1",
-            "tp_enabled": "1",
-            "breakeven_enabled": "0",
+            "tp_enabled": "Enabled",
+            "breakeven_enabled": "Disabled",
             "breakeven_trigger_pct": "1",
             "breakeven_offset_pct": "0",
-            "trailing_enabled": "0",
+            "trailing_enabled": "Disabled",
             "trailing_trigger_pct": "2",
             "trailing_step_pct": "1",
             "trailing_distance_pct": "1",
-            "trailing_move_immediately": "1",
+            "trailing_move_immediately": "Enabled",
             "same_side_policy": "IGNORE",
         }
 
-        items: List[QStandardItem] = []
-        for col_name, _label, _ftype in PAIRS_COLUMNS:
-            it = QStandardItem(defaults.get(col_name, ""))
-            it.setTextAlignment(Qt.AlignCenter)
-            items.append(it)
-        self.pairs_model.appendRow(items)
+        self.pairs_model.append_row([defaults.get(c, "") for c in PAIRS_COL_NAMES])
         self._log("➕ Added pair row (no guardado aún).\n")
 
     def delete_selected_pair(self) -> None:
@@ -684,29 +881,23 @@ class BotGUI(QMainWindow):
         if not idx.isValid():
             return
         row = idx.row()
-        sym = (self.pairs_model.item(row, 0).text() if self.pairs_model.item(row, 0) else "").upper().strip()
+        sym = self.pairs_model.text(row, PAIRS_IDX_SYM).upper().strip()
 
         if not sym:
-            self.pairs_model.removeRow(row)
+            self.pairs_model.remove_row(row)
             return
 
         if QMessageBox.question(self, "Confirm", f"Eliminar {sym} (pairs_config + tp_levels)?") != QMessageBox.Yes:
             return
 
         try:
-            conn = connect_db(self.db_path)
-            ensure_tables_exist(conn)
+            conn = self._db()
             with conn:
                 delete_pair(conn, sym)
             self._log(f"🗑️ Deleted {sym} from DB.\n")
-            self._refresh_all()
+            self._refresh_all(force=True)
         except Exception as e:
             QMessageBox.critical(self, "DB Error", str(e))
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
 
     def add_tp_row(self) -> None:
         sym = self.cmb_symbol.currentText().upper().strip()
@@ -714,10 +905,7 @@ class BotGUI(QMainWindow):
             QMessageBox.warning(self, "Info", "No hay símbolo seleccionado.")
             return
 
-        max_level = 0
-        for r in range(self.tp_model.rowCount()):
-            it = self.tp_model.item(r, 1)
-            max_level = max(max_level, _to_int(it.text() if it else 0))
+        max_level = max((_to_int(r[TP_IDX_LEVEL]) for r in self.tp_model.rows()), default=0)
         next_level = max_level + 1
 
         defaults = {
@@ -725,14 +913,9 @@ class BotGUI(QMainWindow):
             "level": str(next_level),
             "target_pct": "1",
             "close_frac": "30",
-            "is_enabled": "1",
+            "is_enabled": "Enabled",
         }
-        items: List[QStandardItem] = []
-        for col_name, _label, _ftype in TP_COLUMNS:
-            it = QStandardItem(defaults.get(col_name, ""))
-            it.setTextAlignment(Qt.AlignCenter)
-            items.append(it)
-        self.tp_model.appendRow(items)
+        self.tp_model.append_row([defaults.get(c, "") for c in TP_COL_NAMES])
         self._log(f"➕ Added TP row for {sym} (no guardado aún).\n")
 
     def delete_selected_tp(self) -> None:
@@ -740,37 +923,30 @@ class BotGUI(QMainWindow):
         if not idx.isValid():
             return
         row = idx.row()
-        sym = (self.tp_model.item(row, 0).text() if self.tp_model.item(row, 0) else "").upper().strip()
-        lvl = _to_int(self.tp_model.item(row, 1).text() if self.tp_model.item(row, 1) else 0)
+        sym = self.tp_model.text(row, TP_IDX_SYM).upper().strip()
+        lvl = _to_int(self.tp_model.text(row, TP_IDX_LEVEL))
 
         if not sym or lvl <= 0:
-            self.tp_model.removeRow(row)
+            self.tp_model.remove_row(row)
             return
 
         if QMessageBox.question(self, "Confirm", f"Eliminar TP {sym} level={lvl}?") != QMessageBox.Yes:
             return
 
         try:
-            conn = connect_db(self.db_path)
-            ensure_tables_exist(conn)
+            conn = self._db()
             with conn:
                 delete_tp(conn, sym, lvl)
             self._log(f"🗑️ Deleted TP {sym} level={lvl} from DB.\n")
             self._load_tp_for_symbol(sym)
         except Exception as e:
             QMessageBox.critical(self, "DB Error", str(e))
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
 
     # ---------- Save ----------
 
     def save_all(self) -> None:
         try:
-            conn = connect_db(self.db_path)
-            ensure_tables_exist(conn)
+            conn = self._db()
 
             pairs_rows = self._collect_pairs_rows()
             tp_rows = self._collect_tp_rows()
@@ -778,63 +954,61 @@ class BotGUI(QMainWindow):
             self._validate_pairs(pairs_rows)
             self._validate_tps(tp_rows)
 
+            pairs_params = [tuple(pr.get(c) for c in PAIRS_COL_NAMES) for pr in pairs_rows]
+
+            # symbol/level ya validados: un executemany por tabla, una transacción
             with conn:
-                for pr in pairs_rows:
-                    upsert_pair(conn, pr)
-                for tr in tp_rows:
-                    upsert_tp(conn, tr)
+                conn.executemany(PAIRS_INSERT_SQL, pairs_params)
+                conn.executemany(TP_INSERT_SQL, [tuple(tr.get(c) for c in TP_COL_NAMES) for tr in tp_rows])
 
             self._log("✅ Save DB OK.\n")
-            self._refresh_all()
+
+            # la tabla de pares queda igual a lo que acabamos de escribir: se
+            # pinta desde memoria (mismo orden que PAIRS_SELECT_SQL) sin re-leerla
+            pairs_params.sort(key=lambda t: t[PAIRS_IDX_SYM])
+            self._fill_pairs(pairs_params)
+            self._fill_symbol_combo(pairs_params)
+            self._load_tp_for_symbol(self.cmb_symbol.currentText())
+            self._db_stamp = self._current_db_stamp()
+            self._ui_dirty = False
 
         except Exception as e:
             QMessageBox.critical(self, "Save Error", str(e))
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
 
     def _collect_pairs_rows(self) -> List[Dict[str, Any]]:
         rows: List[Dict[str, Any]] = []
 
-        idx_ost = next(i for i, c in enumerate(PAIRS_COLUMNS) if c[0] == "order_size_type")
-        idx_osv = next(i for i, c in enumerate(PAIRS_COLUMNS) if c[0] == "order_size_value")
-
-        for r in range(self.pairs_model.rowCount()):
+        for row in self.pairs_model.rows():
             d: Dict[str, Any] = {}
 
-            ost_item = self.pairs_model.item(r, idx_ost)
-            ost = (ost_item.text() if ost_item else "").upper().strip()
+            ost = row[PAIRS_IDX_OST].upper().strip()
 
-            for cidx, (col_name, _label, ftype) in enumerate(PAIRS_COLUMNS):
-                it = self.pairs_model.item(r, cidx)
-                txt = (it.text() if it else "").strip()
+            for cidx, (col_name, conv) in enumerate(zip(PAIRS_COL_NAMES, PAIRS_COL_UI_TO_DB)):
+                txt = row[cidx].strip()
 
                 if col_name == "symbol":
                     d["symbol"] = txt.upper()
                     continue
 
-                if cidx == idx_osv:
+                if cidx == PAIRS_IDX_OSV:
                     d["order_size_value"] = order_size_value_ui_to_db(ost, txt)
                     continue
 
-                d[col_name] = ui_to_db(txt, ftype)
+                d[col_name] = conv(txt)
 
             rows.append(d)
         return rows
 
     def _collect_tp_rows(self) -> List[Dict[str, Any]]:
         rows: List[Dict[str, Any]] = []
-        for r in range(self.tp_model.rowCount()):
+        for row in self.tp_model.rows():
             d: Dict[str, Any] = {}
-            for cidx, (col_name, _label, ftype) in enumerate(TP_COLUMNS):
-                it = self.tp_model.item(r, cidx)
-                txt = (it.text() if it else "").strip()
+            for cidx, (col_name, conv) in enumerate(zip(TP_COL_NAMES, TP_COL_UI_TO_DB)):
+                txt = row[cidx].strip()
                 if col_name == "symbol":
                     d["symbol"] = txt.upper()
                 else:
-                    d[col_name] = ui_to_db(txt, ftype)
+                    d[col_name] = conv(txt)
             rows.append(d)
         return rows
 
@@ -849,7 +1023,7 @@ class BotGUI(QMainWindow):
             seen.add(sym)
 
             mm = str(p.get("margin_mode") or "").upper().strip()
-            if mm not in ("ISOLATION", "CROSS"):
+            if mm not in _MARGIN_MODES:
                 raise ValueError(f"{sym}: margin_mode inválido: {mm}")
 
             lev = int(p.get("leverage") or 0)
@@ -857,21 +1031,16 @@ class BotGUI(QMainWindow):
                 raise ValueError(f"{sym}: leverage inválido: {lev}")
 
             ost = str(p.get("order_size_type") or "").upper().strip()
-            if ost not in ("MARGIN_USDT", "NOTIONAL_USDT", "PCT_BALANCE"):
+            if ost not in _ORDER_SIZE_TYPES:
                 raise ValueError(f"{sym}: order_size_type inválido: {ost}")
 
-            for k in (
-                "sl_pct",
-                "breakeven_trigger_pct", "breakeven_offset_pct",
-                "trailing_trigger_pct",
-                "trailing_step_pct", "trailing_distance_pct",
-            ):
+            for k in _PCT_VALIDATION_KEYS:
                 v = float(p.get(k) or 0.0)
                 if v < 0 or v > 1:
                     raise ValueError(f"{sym}: {k} fuera de rango 0..1 (BD). Valor={v}")
 
             ssp = str(p.get("same_side_policy") or "").upper().strip()
-            if ssp not in ("IGNORE", "RESET_ORDERS"):
+            if ssp not in _SAME_SIDE_POLICIES:
                 raise ValueError(f"{sym}: same_side_policy inválido: {ssp}")
 
     def _validate_tps(self, tps: List[Dict[str, Any]]) -> None:
@@ -9,24 +9,52 @@ Reglas:
 - Diferentes símbolos sí pueden procesarse en paralelo.
 
 Implementación:
-- Un worker thread por símbolo (se crea bajo demanda).
-- Cada worker consume su Queue FIFO y ejecuta el callback de procesamiento.
+- Cada símbolo tiene su deque FIFO y un flag "busy" (protegidos por un Lock propio del símbolo).
+- Un pool compartido de hilos (se crean bajo demanda y se reutilizan) drena los símbolos:
+  al encolar en un símbolo sin busy se marca busy y se manda el símbolo al pool; el hilo que
+  lo toma procesa su cola en orden hasta vaciarla y libera el busy. Así nunca hay dos hilos
+  en el mismo símbolo.
+- Sin max_workers explícito el tope del pool crece con los símbolos conocidos: cada símbolo
+  puede tener su hilo a la vez (el processor espera fills ~60 s; un símbolo no debe esperar
+  a los de otros) y solo hay tantos hilos como símbolos con trabajo simultáneo.
+  Con max_workers explícito es un tope duro (más símbolos a la vez esperan turno).
 - Si el callback falla, se loguea y se continúa con la siguiente señal (no se muere el worker).
 """
 
 from __future__ import annotations
 
-import threading
+import os
 import queue
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, Optional
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+log = logging.getLogger("symbol_queue")
 
+class EnqueueResult(IntEnum):
+    """
+    Resultado de encolar. REJECTED_FULL vale 0 (falsy): `if not ok` sigue
+    funcionando como con el bool de antes.
+    """
+    REJECTED_FULL = 0
+    ACCEPTED = 1
+    ACCEPTED_HIGH_WATER = 2  # encolada, pero la cola pasó el 80%: conviene frenar
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class EnqueuedSignal:
     symbol: str
     payload: dict
-    received_ts: float
+    # reloj monotónico en ns (solo para medir latencias; no es epoch)
+    received_ts: int = field(default_factory=time.monotonic_ns)
+
+    def __post_init__(self) -> None:
+        # normalizado una vez al crear la señal (enqueue ya no lo repite)
+        object.__setattr__(self, "symbol", (self.symbol or "").upper().strip())
 
 
 class SymbolQueueManager:
@@ -35,108 +63,250 @@ class SymbolQueueManager:
         processor: Callable[[EnqueuedSignal], None],
         max_queue_per_symbol: int = 500,
         daemon_workers: bool = True,
+        max_workers: Optional[int] = None,
     ) -> None:
         """
-        processor: función que procesa UNA señal (bloqueante). Se llama en el worker del símbolo.
+        processor: función que procesa UNA señal (bloqueante). Se llama en un hilo del pool.
         max_queue_per_symbol: límite duro FIFO por símbolo (si se llena, se rechaza la señal).
+        max_workers: tope duro opcional de hilos del pool. Por defecto (None) no hay
+                     tope: al menos un hilo posible por símbolo conocido (el
+                     processor es casi todo espera de red).
         """
         self._processor = processor
         self._max_q = int(max_queue_per_symbol)
+        self._high_water = int(self._max_q * 0.8)
         self._daemon = bool(daemon_workers)
+        # hilos que prime() arranca por adelantado (el resto, bajo demanda)
+        self._prespawn = max(4, 2 * (os.cpu_count() or 1))
+        self._hard_cap = bool(max_workers)
+        self._max_workers = int(max_workers) if max_workers else self._prespawn
 
-        self._lock = threading.RLock()
-        self._queues: Dict[str, "queue.Queue[EnqueuedSignal]"] = {}
-        self._threads: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()  # alta de símbolos y tamaño del pool
+        # por símbolo: (deque, Lock) en una sola entrada (un lookup por señal);
+        # deque y busy se tocan solo bajo ese Lock (un solo hilo drena cada símbolo)
+        self._lanes: Dict[str, Tuple["deque[EnqueuedSignal]", threading.Lock]] = {}
+        self._busy: Dict[str, bool] = {}
         self._stop_flags: Dict[str, threading.Event] = {}
+        self._drops: Dict[str, int] = {}  # rechazos por cola llena (observabilidad)
 
-    def enqueue(self, signal: EnqueuedSignal) -> bool:
+        # pool: símbolos listos para drenar
+        self._ready: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._workers: List[threading.Thread] = []
+        # bajo _lock: hilos bloqueados en _ready, símbolos en _ready sin hilo aún
+        # y centinelas (None) de stop_all que aún no tomó nadie
+        self._idle = 0
+        self._pending = 0
+        self._exiting = 0
+
+    def enqueue(self, signal: EnqueuedSignal) -> EnqueueResult:
         """
         Encola una señal. Devuelve:
-        - True si se encoló
-        - False si se rechazó por cola llena
+        - ACCEPTED si se encoló
+        - ACCEPTED_HIGH_WATER si se encoló pero la cola quedó por encima del 80%
+        - REJECTED_FULL si se rechazó por cola llena (falsy)
         """
-        symbol = (signal.symbol or "").upper().strip()
-        if not symbol:
-            raise ValueError("signal.symbol vacío")
+        symbol = signal.symbol
 
-        with self._lock:
-            q = self._queues.get(symbol)
-            if q is None:
-                q = queue.Queue(maxsize=self._max_q)
-                self._queues[symbol] = q
+        # fast path (sin _lock): símbolo ya conocido (o primado), un solo lookup.
+        # Los dicts solo se amplían bajo _lock.
+        lane = self._lanes.get(symbol)
+        if lane is None:
+            if not symbol:
+                raise ValueError("signal.symbol vacío")
+            lane = self._add_symbol(symbol)
+        dq, lk = lane
 
+        with lk:
             # cola llena -> rechazo
-            if q.full():
-                return False
-
-            q.put_nowait(signal)
-
-            # crea worker si no existe
-            if symbol not in self._threads or not self._threads[symbol].is_alive():
-                stop_ev = threading.Event()
-                self._stop_flags[symbol] = stop_ev
-                t = threading.Thread(
-                    target=self._worker_loop,
-                    args=(symbol, stop_ev),
-                    name=f"symbol-worker:{symbol}",
-                    daemon=self._daemon,
-                )
-                self._threads[symbol] = t
-                t.start()
-
-            return True
+            if len(dq) >= self._max_q:
+                self._drops[symbol] += 1
+                return EnqueueResult.REJECTED_FULL
+            dq.append(signal)
+            res = EnqueueResult.ACCEPTED_HIGH_WATER if len(dq) >= self._high_water else EnqueueResult.ACCEPTED
+            if not self._claim(symbol):
+                return res  # ya hay un hilo drenando este símbolo: la tomará en orden
+
+        self._schedule(symbol)
+        return res
+
+    def enqueue_many(self, signals: Iterable[EnqueuedSignal]) -> List[EnqueueResult]:
+        """
+        Encola varias señales de golpe: un Lock y (como mucho) un envío al pool
+        por símbolo distinto. Devuelve un EnqueueResult por señal, en el mismo
+        orden (como enqueue). El orden FIFO se respeta por símbolo.
+        """
+        sigs = list(signals)
+        by_symbol: Dict[str, List[int]] = {}
+        for i, sig in enumerate(sigs):
+            if not sig.symbol:
+                raise ValueError("signal.symbol vacío")
+            by_symbol.setdefault(sig.symbol, []).append(i)
+
+        out = [EnqueueResult.REJECTED_FULL] * len(sigs)
+        for symbol, idxs in by_symbol.items():
+            lane = self._lanes.get(symbol)
+            if lane is None:
+                lane = self._add_symbol(symbol)
+            dq, lk = lane
+
+            with lk:
+                room = max(self._max_q - len(dq), 0)
+                for i in idxs[:room]:
+                    dq.append(sigs[i])
+                    out[i] = EnqueueResult.ACCEPTED_HIGH_WATER if len(dq) >= self._high_water else EnqueueResult.ACCEPTED
+                self._drops[symbol] += max(len(idxs) - room, 0)
+                if room == 0 or not self._claim(symbol):
+                    continue
+
+            self._schedule(symbol)
+        return out
+
+    def _claim(self, symbol: str) -> bool:
+        """
+        Con el Lock del símbolo tomado: marca busy si estaba libre (True = hay
+        que mandarlo al pool; False = ya hay un hilo drenándolo).
+        """
+        if self._busy[symbol]:
+            return False
+        self._busy[symbol] = True
+        if self._stop_flags[symbol].is_set():
+            # símbolo parado con stop_symbol: una señal nueva lo re-arranca
+            self._stop_flags[symbol] = threading.Event()
+        return True
+
+    def _add_symbol(self, symbol: str) -> Tuple["deque[EnqueuedSignal]", threading.Lock]:
+        """
+        Primera señal del símbolo: crea sus estructuras bajo _lock.
+        """
+        with self._lock:
+            lane = self._lanes.get(symbol)
+            if lane is None:
+                self._busy[symbol] = False
+                self._drops[symbol] = 0
+                self._stop_flags[symbol] = threading.Event()
+                lane = (deque(), threading.Lock())
+                self._lanes[symbol] = lane  # último: es la clave del fast path
+                if not self._hard_cap:
+                    # sin tope explícito: todos los símbolos pueden ir en paralelo
+                    self._max_workers = max(self._max_workers, len(self._lanes))
+            return lane
+
+    def prime(self, symbols: Iterable[str]) -> None:
+        """
+        Crea por adelantado las estructuras de los símbolos conocidos (los de la
+        DB) y arranca los hilos del pool que van a hacer falta, para que la
+        primera señal de cada símbolo no pague el alta ni el arranque de un hilo.
+        """
+        n = 0
+        for sym in symbols:
+            sym = (sym or "").upper().strip()
+            if sym:
+                self._add_symbol(sym)
+                n += 1
+
+        with self._lock:
+            while len(self._workers) < min(n, self._prespawn, self._max_workers):
+                self._spawn_worker()
+
+    def _schedule(self, symbol: str) -> None:
+        """
+        Manda el símbolo al pool. Si hay más símbolos esperando que hilos libres
+        se crea un hilo nuevo, hasta _max_workers (si no, espera en _ready).
+        """
+        with self._lock:
+            self._pending += 1
+            # los hilos que van a salir por un centinela no cuentan
+            if (self._pending > self._idle - self._exiting
+                    and len(self._workers) - self._exiting < self._max_workers):
+                self._spawn_worker()
+        self._ready.put(symbol)
+
+    def _spawn_worker(self) -> None:
+        # bajo _lock
+        t = threading.Thread(
+            target=self._pool_loop,
+            name=f"symbol-worker-{len(self._workers)}",
+            daemon=self._daemon,
+        )
+        self._workers.append(t)
+        t.start()
 
     def qsize(self, symbol: str) -> int:
         symbol = (symbol or "").upper().strip()
-        with self._lock:
-            q = self._queues.get(symbol)
-            return q.qsize() if q else 0
+        lane = self._lanes.get(symbol)
+        return len(lane[0]) if lane is not None else 0
+
+    def drops(self, symbol: str) -> int:
+        """Señales rechazadas por cola llena desde el arranque."""
+        return self._drops.get((symbol or "").upper().strip(), 0)
 
     def stop_symbol(self, symbol: str) -> None:
         """
-        Señala al worker de un símbolo que pare (cuando pueda).
-        Nota: no elimina la cola; solo detiene el thread.
+        Señala al símbolo que pare (cuando termine la señal en curso).
+        Nota: no elimina la cola; la próxima señal encolada lo vuelve a arrancar.
         """
         symbol = (symbol or "").upper().strip()
-        with self._lock:
-            ev = self._stop_flags.get(symbol)
-            if ev:
-                ev.set()
+        lane = self._lanes.get(symbol)
+        if lane is None:
+            return
+        # bajo el Lock del símbolo: _claim puede estar reemplazando el Event
+        with lane[1]:
+            self._stop_flags[symbol].set()
 
     def stop_all(self) -> None:
         """
-        Señala a todos los workers que paren.
+        Señala a todos los símbolos que paren y termina los hilos del pool
+        (un centinela None por hilo, cuando acaben la señal en curso). Si
+        llegan señales nuevas, el pool vuelve a crear hilos bajo demanda.
         """
         with self._lock:
-            for ev in self._stop_flags.values():
-                ev.set()
+            for symbol, (_, lk) in self._lanes.items():
+                with lk:
+                    self._stop_flags[symbol].set()
+            n = len(self._workers) - self._exiting
+            self._exiting += n
+        for _ in range(n):
+            self._ready.put(None)
 
-    def _worker_loop(self, symbol: str, stop_ev: threading.Event) -> None:
+    def _pool_loop(self) -> None:
         """
-        Loop FIFO del símbolo. Garantiza serialización por símbolo.
+        Hilo del pool: toma símbolos listos y los drena de a uno (hasta un None).
         """
-        while not stop_ev.is_set():
-            sig: Optional[EnqueuedSignal] = None
-
-            # leer cola (con timeout para poder observar stop_ev)
+        while True:
             with self._lock:
-                q = self._queues.get(symbol)
+                self._idle += 1
+            symbol = self._ready.get()
+            with self._lock:
+                self._idle -= 1
+                if symbol is None:
+                    # centinela de stop_all
+                    self._exiting -= 1
+                    self._workers.remove(threading.current_thread())
+                    return
+                self._pending -= 1
+            self._drain_symbol(symbol)
 
-            if q is None:
-                return
+    def _drain_symbol(self, symbol: str) -> None:
+        """
+        Procesa la cola del símbolo en orden FIFO hasta vaciarla (o hasta stop).
+        Garantiza serialización por símbolo: solo un hilo tiene su busy.
+        """
+        dq, lk = self._lanes[symbol]
+        with lk:
+            stop_ev = self._stop_flags[symbol]
 
-            try:
-                sig = q.get(timeout=0.5)
-            except queue.Empty:
-                continue
+        while True:
+            with lk:
+                # busy se libera bajo el mismo Lock con el que enqueue mira la
+                # deque: ninguna señal queda encolada sin nadie que la drene
+                if not dq or stop_ev.is_set():
+                    self._busy[symbol] = False
+                    return
+                sig = dq.popleft()
 
             try:
                 self._processor(sig)  # BLOQUEANTE
             except Exception as e:
-                # No matamos el worker; seguimos con la siguiente
-                print(f"⚠️ Worker {symbol}: error procesando señal: {e}")
-            finally:
-                try:
-                    q.task_done()
-                except Exception:
-                    pass
+                # No matamos el worker; seguimos con la siguiente (con
+                # traceback; la escritura a stdout la hace el listener de app.py)
+                log.exception("⚠️ Worker %s: error procesando señal: %s", symbol, e)